@@ -17,8 +17,32 @@
 
 from __future__ import print_function, division, absolute_import
 
+import os
+import sys
+import time
+
+# roughly when the configure script started importing attoconf
+_import_time = time.time()
+
 from .core import Project, Build
 
+# (name, start, end, args) of each part of the last registration,
+# for --trace: that's over before the options are parsed.
+timeline = []
+_registered = False
+
+
+def enable_trace(filename):
+    ''' Type hook for --trace=FILE, see trace.enable.
+
+        This way, nothing about tracing is imported without it
+        (if trace was never imported, there's nothing to turn off).
+    '''
+    if filename or 'attoconf.trace' in sys.modules:
+        from . import trace
+        trace.enable(filename)
+    return filename
+
 class PolymorphicSlotMergerMetaclass(type):
 
     def __new__(meta, name, bases, dct):
@@ -38,8 +62,7 @@ class PolymorphicSlotMergerMetaclass(type):
     # TODO: remove *args for 1.0
     def __call__(cls, *args, **kwargs):
         instance = type.__call__(cls, *args, **kwargs)
-        if 'package' in kwargs or not isinstance(instance,
-                __import__('attoconf.lib.install', fromlist=['Install']).Install):
+        if instance._ready_to_jiggle_():
             instance._do_jiggle()
         return instance
 
@@ -58,29 +81,55 @@ class ClassyProject(Project):
     def __init__(self, srcdir):
         super(ClassyProject, self).__init__(srcdir)
 
+    def _ready_to_jiggle_(self):
+        ''' Whether registration can happen as soon as __init__ returns.
+        '''
+        return True
+
     # TODO: remove this for 1.0
     def jiggle(self):
         pass
 
     def _do_jiggle(self):
+        global timeline, _registered
+        start = time.time()
+        timeline = []
+        if not _registered:
+            _registered = True
+            timeline.append(('import', _import_time, start, None))
+        args = {}
+        filename = None
+        if os.environ.get('ATTOCONF_CACHE_DIR'):
+            # images are only used then, see image.py
+            from . import image
+            filename = image.image_file(self)
+        if filename is not None and image.load(self, filename):
+            args['image'] = 'loaded'
+        else:
+            self._register()
+            if filename is not None and image.save(self, filename):
+                args['image'] = 'saved'
+        timeline.append(('register', start, time.time(), args))
+
+    def _register(self):
+        ''' Run all the registration hooks.
+        '''
         self.order.append(None)
-        self.general()
-        self.order.append(None)
-        self.paths()
-        self.order.append(None)
-        self.arches()
-        self.order.append(None)
-        self.vars()
-        self.order.append(None)
-        self.features()
-        self.order.append(None)
-        self.packages()
-        self.order.append(None)
+        for phase in [self.general, self.paths, self.arches, self.vars,
+                self.features, self.packages]:
+            start = time.time()
+            phase()
+            timeline.append((phase.__name__, start, time.time(), None))
+            self.order.append(None)
 
         if 0:
             self.tests()
             self.order.append(None)
+        # probes run in the background; post hooks must see their results
+        self.checks.append(Build.join)
+        start = time.time()
         self.post()
+        timeline.append(('post', start, time.time(), None))
         self.order.append(None)
 
     def general(self):
@@ -96,6 +145,11 @@ class ClassyProject(Project):
         self.help.add_option('--help=hidden',
                 help='display help you should never ever ever care about',
                 hidden=False)
+        self.add_option('--trace', init='',
+                type=enable_trace, check=None,
+                help='write a timeline of this run to FILE (Chrome trace format)',
+                hidden=False,
+                help_var='FILE', help_def='none')
 
     def paths(self):
         ''' Registration hook for path-related options.
@@ -20,6 +20,7 @@ from __future__ import print_function, division, absolute_import
 from collections import namedtuple, OrderedDict
 import os
 import sys
+import threading
 
 from .help import Help
 
@@ -27,9 +28,253 @@ from .help import Help
 Option = namedtuple('Option', ['type', 'init'])
 class ArgumentError(Exception): pass
 
+def _identity_json(ident):
+    # the same as it comes back from json
+    if ident is None:
+        return None
+    return list(ident[:-1]) + [list(ident[-1])]
+
+# environment variables that change what configure finds, besides
+# the ones that are options; checks can name more in an env attribute
+digest_env = (
+        'PATH',
+        'CPATH',
+        'C_INCLUDE_PATH',
+        'CPLUS_INCLUDE_PATH',
+        'LIBRARY_PATH',
+        'COMPILER_PATH',
+        'GCC_EXEC_PREFIX',
+)
+
 def as_var(name):
     return name.lstrip('-').replace('-', '_').upper()
 
+def value_key(val):
+    ''' A str that is equal for equal values of a var, even between runs.
+
+        It is the pickle, without a memo (so that it doesn't matter
+        which parts of the value are shared), so it can be loaded
+        to get the value back.
+    '''
+    import cPickle
+    from cStringIO import StringIO
+    out = StringIO()
+    p = cPickle.Pickler(out, 2)
+    p.fast = 1
+    p.dump(val)
+    return out.getvalue()
+
+# what a check read (as a value_key(), or None if the var wasn't set),
+# what it wrote (likewise), and which files it added to build.files
+CheckRecord = namedtuple('CheckRecord', ['name', 'reads', 'writes', 'files'])
+
+# the Tracker of the check running in each thread, if any
+_tracking = threading.local()
+
+class Tracker(object):
+    ''' Collect what one check does to a build's vars and files.
+    '''
+    __slots__ = ('build', 'reads', 'assigned', 'files', 'opaque')
+    def __init__(self, build):
+        self.build = build
+        self.reads = {}
+        self.assigned = set()
+        self.files = set()
+        # some value couldn't be pickled, so nothing can be known
+        self.opaque = False
+
+    def read(self, var):
+        if var in self.reads or var in self.assigned:
+            return
+        vars = self.build.vars
+        if not dict.__contains__(vars, var):
+            self.reads[var] = None
+            return
+        try:
+            self.reads[var] = value_key(dict.__getitem__(vars, var))
+        except Exception:
+            self.reads[var] = None
+            self.opaque = True
+
+    def record(self, name):
+        ''' What the check did, once it is done.
+
+            Vars that were only read are still checked for changes,
+            since many values (e.g. a ShellList) are modified in place.
+        '''
+        if self.opaque:
+            return None
+        vars = self.build.vars
+        writes = {}
+        for var in self.assigned.union(self.reads):
+            if dict.__contains__(vars, var):
+                try:
+                    key = value_key(dict.__getitem__(vars, var))
+                except Exception:
+                    return None
+            else:
+                key = None
+            if var in self.assigned or key != self.reads[var]:
+                writes[var] = key
+        return CheckRecord(name, self.reads, writes, frozenset(self.files))
+
+def _tracker(what):
+    # only if what is the vars or files of the build being tracked
+    tracker = getattr(_tracking, 'tracker', None)
+    if tracker is not None and (tracker.build.vars is what
+            or tracker.build.files is what):
+        return tracker
+    return None
+
+class VarDict(dict):
+    ''' The type of build.vars, which tells the running check's Tracker
+        about every var that is looked at or changed.
+    '''
+    __slots__ = ()
+
+    def _read(self, var):
+        tracker = _tracker(self)
+        if tracker is not None:
+            tracker.read(var)
+
+    def _read_all(self):
+        tracker = _tracker(self)
+        if tracker is not None:
+            for var in dict.keys(self):
+                tracker.read(var)
+
+    def _assign(self, var):
+        tracker = _tracker(self)
+        if tracker is not None:
+            tracker.assigned.add(var)
+
+    def __getitem__(self, var):
+        self._read(var)
+        return dict.__getitem__(self, var)
+
+    def get(self, var, default=None):
+        self._read(var)
+        return dict.get(self, var, default)
+
+    def __contains__(self, var):
+        self._read(var)
+        return dict.__contains__(self, var)
+
+    def has_key(self, var):
+        return var in self
+
+    def __setitem__(self, var, val):
+        self._assign(var)
+        dict.__setitem__(self, var, val)
+
+    def __delitem__(self, var):
+        self._assign(var)
+        dict.__delitem__(self, var)
+
+    def setdefault(self, var, default=None):
+        self._read(var)
+        self._assign(var)
+        return dict.setdefault(self, var, default)
+
+    def pop(self, var, *default):
+        self._read(var)
+        self._assign(var)
+        return dict.pop(self, var, *default)
+
+    def update(self, *args, **kwargs):
+        for var, val in dict(*args, **kwargs).iteritems():
+            self[var] = val
+
+    def __iter__(self):
+        self._read_all()
+        return dict.__iter__(self)
+
+    def iterkeys(self):
+        self._read_all()
+        return dict.iterkeys(self)
+
+    def itervalues(self):
+        self._read_all()
+        return dict.itervalues(self)
+
+    def iteritems(self):
+        self._read_all()
+        return dict.iteritems(self)
+
+    def keys(self):
+        self._read_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._read_all()
+        return dict.values(self)
+
+    def items(self):
+        self._read_all()
+        return dict.items(self)
+
+    def copy(self):
+        self._read_all()
+        return dict.copy(self)
+
+    def __reduce__(self):
+        return VarDict, (dict.items(self),)
+
+class FileSet(set):
+    ''' The type of build.files, which tells the running check's Tracker
+        about every file that is added.
+    '''
+    __slots__ = ()
+
+    def add(self, path):
+        tracker = _tracker(self)
+        if tracker is not None:
+            tracker.files.add(path)
+        set.add(self, path)
+
+    def update(self, paths):
+        for path in paths:
+            self.add(path)
+
+def uses(reads=(), writes=()):
+    ''' Decorator to declare which build.vars a check reads and writes.
+
+        Checks that declare this may run concurrently with other checks
+        that don't touch the same vars; all other checks are barriers.
+
+        They also promise that the vars (and build.files) are all they
+        depend on, so on a reconfigure they may be skipped, see finish().
+    '''
+    def decorate(check):
+        check.reads = frozenset(reads)
+        check.writes = frozenset(writes)
+        return check
+    return decorate
+
+class OptionCheck(object):
+    ''' Call a check hook with the value of the option it belongs to.
+    '''
+    __slots__ = ('check', 'var', 'help_var', 'reads', 'writes')
+    def __init__(self, check, var, help_var):
+        self.check = check
+        self.var = var
+        self.help_var = help_var
+        reads = getattr(check, 'reads', None)
+        writes = getattr(check, 'writes', None)
+        if reads is None or writes is None:
+            self.reads = self.writes = None
+        else:
+            # many checks fill in a default for their own var
+            self.reads = reads | {var}
+            self.writes = writes | {var}
+
+    def __call__(self, bld):
+        self.check(bld, **{self.help_var: bld.vars[self.var]})
+
+    def __reduce__(self):
+        # much smaller (and faster to load) than the slots, see image.py
+        return OptionCheck, (self.check, self.var, self.help_var)
+
 def trim_trailing_slashes(path):
     p, s = os.path.split(path)
     if not s:
@@ -90,7 +335,7 @@ class Project(object):
             to validate the argument.
 
             The check hooks will be called at final time,
-            in the order they were added.
+            in the order they were added (or concurrently, see uses()).
 
             Additionally, a line of help is added, with additional formatting.
         '''
@@ -109,8 +354,8 @@ class Project(object):
         self.options[name] = Option(init=init, type=type)
         if check is not None:
             self.order.append(var)
-            self.checks.append(
-                    lambda bld: check(bld, **{help_var: bld.vars[var]}))
+            self.checks.append(OptionCheck(check, var,
+                    help_var if help_var is not None else var))
 
         if help_var is None:
             help_var = var
@@ -149,16 +394,46 @@ class Build(object):
             'builddir',
             'project',
             'vars',
+            '_jobs',
+            'cache',
+            'probes',
+            'log',
+            'files',
+            'graph',
+            'env',
             '_seen_args',
+            '_key',
     )
     def __init__(self, project, builddir):
         ''' A Build is initially constructed from a project and a build dir.
         '''
         self.project = project
         self.builddir = trim_trailing_slashes(builddir)
-        self.vars = {as_var(k): o.init
-                for (k, o) in project.options.iteritems()}
+        from .types import ShellList
+        # lists are modified in place, and the init belongs to the project
+        self.vars = VarDict((as_var(k), o.init.copy() if isinstance(o.init, ShellList) else o.init)
+                for (k, o) in project.options.iteritems())
+        self._jobs = None
+        self.cache = None
+        self.probes = {}
+        self.log = None
+        # everything read or written whose stat() would change with it
+        self.files = FileSet()
+        # a CheckRecord (or None) for each check, once finish() runs
+        self.graph = None
+        # what configure() was given; tools run with this too
+        self.env = os.environ
         self._seen_args = OrderedDict()
+        self._key = None
+
+    @property
+    def jobs(self):
+        ''' The JobPool for probes, made when first needed.
+        '''
+        if self._jobs is None:
+            from .jobs import JobPool, default_jobs
+            self._jobs = JobPool(default_jobs(), 'probe')
+        return self._jobs
 
     def apply_arg(self, arg):
         ''' Parse a single argument, expanding aliases.
@@ -188,16 +463,109 @@ class Build(object):
             raise sys.exit('Unknown option %s' % k)
         self.vars[as_var(k)] = opt.type(a)
 
-    def finish(self):
+    def finish(self, previous=None, changed=frozenset()):
         ''' With the current set of variables, run all the checks
             and presumably produce some sort of output.
+
+            What each check reads and writes is recorded in self.graph.
+            Given the graph of an earlier run in this build dir, and the
+            files whose stat() changed since, a check that declared its
+            vars (see uses()) or is an output hook is skipped, instead
+            writing what it wrote then, if none of the vars it read then
+            are different now and none of its files changed.
         '''
-        for check in self.project.checks:
+        from . import trace
+        from .jobs import run_checks
+        from .log import ConfigLog
+        checks = self.project.checks
+        self.graph = [None] * len(checks)
+        call = lambda i, check: self.run_check(i, check, previous, changed)
+        self.log = ConfigLog(self.builddir)
+        error = None
+        try:
+            with trace.span('finish', 'configure'):
+                run_checks(self, checks, self.jobs.max_jobs, call)
+                self.join()
+                if previous is not None:
+                    reused = sum(1 for now, then in zip(self.graph, previous)
+                            if then is not None and now is then)
+                    print('Reused %d of %d checks from the last configure'
+                            % (reused, len(checks)))
+                with trace.span('config.status', 'output'):
+                    self.write_status()
+                    self.write_snapshot()
+                    self.write_digest()
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            if error is not None:
+                # probes may still be running (and logging)
+                self.jobs.wait()
+            self.log.close(error)
+            self.log = None
+            trace.dump()
+
+    def run_check(self, i, check, previous, changed):
+        ''' Run (or skip) the i'th check, for finish().
+        '''
+        if previous is not None:
+            then = previous[i]
+            if then is not None and self.still_valid(then, changed):
+                import cPickle
+                for var, key in then.writes.iteritems():
+                    if key is None:
+                        dict.pop(self.vars, var, None)
+                    else:
+                        dict.__setitem__(self.vars, var, cPickle.loads(key))
+                set.update(self.files, then.files)
+                self.graph[i] = then
+                return
+        reads = getattr(check, 'reads', None)
+        writes = getattr(check, 'writes', None)
+        if (reads is None or writes is None) and not getattr(check, 'regenerate', False):
+            # might depend on anything, so it has to run every time
+            check(self)
+            return
+        from . import trace
+        tracker = Tracker(self)
+        # even if they are only changed in place (or from another thread)
+        for var in (reads or frozenset()) | (writes or frozenset()):
+            tracker.read(var)
+        _tracking.tracker = tracker
+        try:
             check(self)
+        finally:
+            _tracking.tracker = None
+        self.graph[i] = tracker.record(trace.check_name(check))
+
+    def still_valid(self, record, changed):
+        ''' Whether a check would do just the same as when it made record.
+        '''
+        if record.files & changed:
+            return False
+        for var, key in record.reads.iteritems():
+            if not dict.__contains__(self.vars, var):
+                if key is not None:
+                    return False
+                continue
+            try:
+                if value_key(dict.__getitem__(self.vars, var)) != key:
+                    return False
+            except Exception:
+                return False
+        return True
+
+    def write_status(self):
+        ''' Write a config.status that regenerates the output files,
+            or with --recheck (or any other args) reruns configure
+            with the same args.
+        '''
+        from .files import OutputFile
         status_file = os.path.join(self.builddir, 'config.status')
-        # open fd to control +x mode
-        status_fd = os.open(status_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0777)
-        with os.fdopen(status_fd, 'w') as status:
+        self.files.add(status_file)
+        attoconf_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        with OutputFile(status_file, 0777) as status:
             print('Generating config.status')
             status.write('#!%s\n' % sys.executable)
             status.write('import os\n')
@@ -205,14 +573,189 @@ class Build(object):
             status.write('old_build_dir = os.path.dirname(sys.argv[0])\n')
             status.write('configure = os.path.join(old_build_dir, %r, "configure")\n'
                     % self.relative_source())
+            status.write('args = sys.argv[1:]\n')
+            status.write('if not args:\n')
+            status.write('    sys.path.insert(0, %r)\n' % attoconf_dir)
+            status.write('    from attoconf.core import regenerate\n')
+            status.write('    if regenerate(old_build_dir):\n')
+            status.write('        sys.exit()\n')
+            status.write('elif args[0] == "--recheck":\n')
+            status.write('    del args[0]\n')
             seen_args = ['='.join(kv) for kv in self._seen_args.iteritems()]
-            status.write('os.execvp(configure, [configure] + %r + sys.argv[1:])\n'
+            status.write('os.execvp(configure, [configure] + %r + args)\n'
                     % seen_args)
 
+    def write_snapshot(self):
+        ''' Save what the output hooks need to run again.
+
+            These are the checks with a true regenerate attribute,
+            which only write files from build.vars.
+
+            The graph is saved separately, in config.graph, since only
+            the next configure needs it and config.status shouldn't
+            have to unpickle it.
+        '''
+        import cPickle
+        from .files import OutputFile
+        project = Project(self.relative_source())
+        project.order = self.project.order
+        project.checks = [c for c in self.project.checks
+                if getattr(c, 'regenerate', False)]
+        for name, obj in [('config.snapshot', (project, self.vars)),
+                ('config.graph', self.graph)]:
+            filename = os.path.join(self.builddir, name)
+            self.files.add(filename)
+            try:
+                data = cPickle.dumps(obj, 2)
+            except Exception:
+                # e.g. some var from a type defined in the configure script;
+                # then config.status just has to run configure again
+                if os.path.exists(filename):
+                    os.remove(filename)
+                continue
+            with OutputFile(filename) as out:
+                out.write(data)
+
+    def configure_key(self, env):
+        ''' Digest of everything about this configure run that isn't a file
+            or an argument: the project and the relevant environment.
+        '''
+        from hashlib import sha1
+        names = set(digest_env)
+        for check in self.project.checks:
+            names.update(getattr(check, 'env', ()))
+        cls = type(self.project)
+        state = (sys.executable, sys.version, cls.__module__, cls.__name__,
+                os.path.abspath(self.project.srcdir),
+                os.path.abspath(self.builddir),
+                [(k, env.get(k)) for k in sorted(names)])
+        return sha1(repr(state)).hexdigest()
+
+    def _digest_state(self):
+        ''' What can change between runs with the same configure_key().
+        '''
+        from .image import main_script
+        from .lib.fingerprint import identity
+        from .types import ShellCommand
+        files = set(self.files)
+        script = main_script()
+        if script is not None:
+            files.add(os.path.abspath(script))
+        for name, mod in sys.modules.items():
+            if mod is not None and (name == 'attoconf' or name.startswith('attoconf.')):
+                path = mod.__file__
+                if path.endswith(('.pyc', '.pyo')):
+                    path = path[:-1]
+                files.add(path)
+        stats = []
+        for path in sorted(files):
+            try:
+                st = os.stat(path)
+                stats.append([path, st.st_ino, st.st_mtime, st.st_size])
+            except OSError:
+                stats.append([path, None])
+        tools = []
+        for var, val in sorted(self.vars.iteritems()):
+            if isinstance(val, ShellCommand):
+                tools.append([val.list,
+                        _identity_json(identity(val, self.env))])
+        return stats, tools
+
+    def write_digest(self):
+        ''' Remember what this run depended on, see up_to_date().
+        '''
+        import json
+        from .files import OutputFile
+        digest_file = os.path.join(self.builddir, 'config.digest')
+        if self._key is None:
+            # not from configure(), so nobody knows what it depended on
+            if os.path.exists(digest_file):
+                os.remove(digest_file)
+            return
+        stats, tools = self._digest_state()
+        with OutputFile(digest_file) as out:
+            json.dump({'key': self._key, 'args': self._seen_args.items(),
+                    'files': stats, 'tools': tools}, out)
+
+    def last_digest(self):
+        ''' Compare with the last successful configure in this build dir.
+
+            If it had the same key, and none of its tools changed since,
+            return the args it was given and the set of its files that
+            did change; otherwise None.
+
+            Tools are compared by identity (the binary's stat) and files
+            by stat, so nothing needs to be run to find out.
+        '''
+        import json
+        from .lib.fingerprint import identity
+        from .types import ShellCommand
+        try:
+            with open(os.path.join(self.builddir, 'config.digest')) as f:
+                data = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if data.get('key') != self._key:
+            return None
+        for cmd, ident in data['tools']:
+            now = identity(ShellCommand([str(a) for a in cmd]), self.env)
+            if _identity_json(now) != ident:
+                return None
+        changed = set()
+        for entry in data['files']:
+            try:
+                st = os.stat(entry[0])
+            except OSError:
+                if entry[1] is not None:
+                    changed.add(entry[0])
+                continue
+            if entry[1:] != [st.st_ino, st.st_mtime, st.st_size]:
+                changed.add(entry[0])
+        return [tuple(kv) for kv in data['args']], changed
+
+    def last_graph(self, changed):
+        ''' The graph saved by the last configure, see finish().
+
+            Returns None if there is none, or if it doesn't match
+            the checks, or if some file that no check recorded
+            (e.g. the configure script) has changed.
+        '''
+        import cPickle
+        from . import trace
+        try:
+            with open(os.path.join(self.builddir, 'config.graph'), 'rb') as f:
+                graph = cPickle.load(f)
+        except Exception:
+            return None
+        checks = self.project.checks
+        if graph is None or len(graph) != len(checks):
+            return None
+        claimed = set()
+        for check, record in zip(checks, graph):
+            if record is not None:
+                if record.name != trace.check_name(check):
+                    return None
+                claimed.update(record.files)
+        if changed - claimed:
+            return None
+        return graph
+
+    def join(self):
+        ''' Wait for all background jobs (e.g. compiler probes) to finish.
+
+            Any check that depends on the result of a probe must come
+            after a call to this; it is also called at the end of finish().
+        '''
+        self.jobs.join()
+
     def configure(self, args, env):
         ''' First apply variables from the environment,
             then call apply_arg() a bunch of times, then finish().
         '''
+        self.env = env
+        jobs = env.get('ATTOCONF_JOBS')
+        if jobs:
+            self.jobs.max_jobs = int(jobs)
         for k in self.project.options:
             if k != as_var(k):
                 continue
@@ -225,7 +768,18 @@ class Build(object):
         for arg in args:
             self.apply_arg(arg)
 
-        self.finish()
+        self._key = self.configure_key(env)
+        last = self.last_digest()
+        if last is None:
+            self.finish()
+            return
+        args, changed = last
+        if args == self._seen_args.items() and not changed:
+            print('Nothing changed since the last configure')
+            from . import trace
+            trace.dump()
+            return
+        self.finish(self.last_graph(changed), changed)
 
     def relative_source(self):
         ''' Return a relative path from the build tree to the source tree.
@@ -236,3 +790,23 @@ class Build(object):
             return os.path.realpath(srcdir)
         return os.path.relpath(os.path.realpath(srcdir),
                 os.path.realpath(builddir))
+
+def regenerate(builddir):
+    ''' Run the output hooks again from builddir's config.snapshot,
+        without configuring again.
+
+        Returns False if there is no usable snapshot.
+    '''
+    import cPickle
+    try:
+        with open(os.path.join(builddir, 'config.snapshot'), 'rb') as f:
+            project, vars = cPickle.load(f)
+    except Exception:
+        return False
+    # the srcdir was saved relative to the build dir
+    project.srcdir = os.path.join(builddir, project.srcdir)
+    build = Build(project, builddir)
+    build.vars = vars
+    for check in project.checks:
+        check(build)
+    return True
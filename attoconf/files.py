@@ -0,0 +1,127 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import errno
+import itertools
+import os
+
+# tempfile would do, but importing it (and random, and hashlib) costs
+# more than config.status regenerating a few files
+_tmp_counter = itertools.count()
+
+def _create_tmp(dir, base):
+    ''' Create a new file next to dir/base, returning (fd, path).
+    '''
+    while True:
+        path = os.path.join(dir, '.%s.tmp-%d-%d'
+                % (base, os.getpid(), next(_tmp_counter)))
+        try:
+            fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0600)
+            return fd, path
+        except OSError as e:
+            # left over by some other process that had the same pid
+            if e.errno != errno.EEXIST:
+                raise
+
+
+def _same_contents(a, b, bufsize=1 << 16):
+    if os.path.getsize(a) != os.path.getsize(b):
+        return False
+    with open(a, 'rb') as fa, open(b, 'rb') as fb:
+        while True:
+            da = fa.read(bufsize)
+            db = fb.read(bufsize)
+            if da != db:
+                return False
+            if not da:
+                return True
+
+
+class OutputFile(object):
+    ''' A generated file, which is only replaced if its content changed.
+
+        Everything is written to a temporary file next to the real one,
+        which (on success) is then either renamed over it, or thrown
+        away if the old file was identical.  Either way nobody ever sees
+        a half-written output, and an unchanged output keeps its mtime,
+        so a reconfigure doesn't make make rebuild everything.
+
+        An existing file keeps its permissions; a new one gets
+        mode & ~umask.  Use it as a context manager:
+
+            with OutputFile(path) as out:
+                out.write(...)
+            if out.changed: ...
+    '''
+    __slots__ = ('filename', 'mode', 'file', 'tmp', 'changed')
+    def __init__(self, filename, mode=0666):
+        self.filename = filename
+        self.mode = mode
+        self.changed = None
+        dir, base = os.path.split(os.path.abspath(filename))
+        fd, self.tmp = _create_tmp(dir, base)
+        self.file = os.fdopen(fd, 'wb')
+
+    def write(self, s):
+        self.file.write(s)
+
+    def writelines(self, lines):
+        self.file.writelines(lines)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, ty, v, tb):
+        if ty is None:
+            self.commit()
+        else:
+            self.discard()
+
+    def discard(self):
+        ''' Forget everything that was written.
+        '''
+        self.file.close()
+        os.remove(self.tmp)
+
+    def commit(self):
+        ''' Replace the real file, if needed, and return whether it was.
+        '''
+        self.file.close()
+        try:
+            try:
+                mode = os.stat(self.filename).st_mode & 07777
+            except OSError as e:
+                if e.errno != errno.ENOENT:
+                    raise
+                umask = os.umask(0)
+                os.umask(umask)
+                mode = self.mode & ~umask
+            else:
+                if _same_contents(self.tmp, self.filename):
+                    os.remove(self.tmp)
+                    self.changed = False
+                    return False
+            # the temporary file is always 0600
+            os.chmod(self.tmp, mode)
+            os.rename(self.tmp, self.filename)
+        except:
+            os.remove(self.tmp)
+            raise
+        self.changed = True
+        return True
@@ -0,0 +1,196 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Project images: the result of registration, saved for next time.
+
+    Registering hundreds of options costs more than loading the result,
+    and a config.status re-exec registers the same thing again and again.
+    If ATTOCONF_CACHE_DIR is set, the registered options, aliases, order,
+    checks and help are pickled there, keyed by the content of the
+    configure script and of attoconf itself (among other things),
+    so changing either one just means registering again.
+    Other modules from the source dir that are already loaded
+    (e.g. helpers the configure script imports) count too.
+
+    Since loading a pickle can run anything, images are only loaded
+    from a directory (and files) that only this user can write.
+
+    Anything that can't be pickled (say, a lambda check) means there is
+    no image for that project, which is not an error.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import copy_reg
+import os
+import stat
+import sys
+import types
+
+from .core import Project
+
+
+registered = ('aliases', 'options', 'help', 'order', 'checks')
+
+
+def _reduce_method(m):
+    # bound or unbound; either way getattr gets it back
+    return getattr, (m.im_self if m.im_self is not None else m.im_class,
+            m.im_func.__name__)
+copy_reg.pickle(types.MethodType, _reduce_method)
+
+def _file_digest(filename):
+    from hashlib import sha1
+    with open(filename, 'rb') as f:
+        return sha1(f.read()).hexdigest()
+
+def attoconf_digest():
+    ''' Digest of the source of the parts of attoconf that are loaded.
+
+        Only those can have taken part in registration; checks and
+        hooks from elsewhere are pickled by name, not by value.
+    '''
+    from hashlib import sha1
+    h = sha1()
+    for name, mod in sorted(sys.modules.items()):
+        if mod is None or not (name == 'attoconf' or name.startswith('attoconf.')):
+            continue
+        path = mod.__file__
+        if path.endswith(('.pyc', '.pyo')):
+            path = path[:-1]
+        h.update('%s %s\n' % (name, _file_digest(path)))
+    return h.hexdigest()
+
+def local_digest(dirs):
+    ''' Digest of the source of the loaded modules from under dirs.
+    '''
+    from hashlib import sha1
+    dirs = [os.path.join(os.path.realpath(d), '') for d in dirs]
+    h = sha1()
+    for name, mod in sorted(sys.modules.items()):
+        path = getattr(mod, '__file__', None)
+        if path is None or name == '__main__':
+            continue
+        if path.endswith(('.pyc', '.pyo')):
+            path = path[:-1]
+        real = os.path.realpath(path)
+        if any(real.startswith(d) for d in dirs) and os.path.isfile(real):
+            h.update('%s %s\n' % (name, _file_digest(real)))
+    return h.hexdigest()
+
+def main_script():
+    ''' The configure script being run, if there is one.
+    '''
+    return getattr(sys.modules.get('__main__'), '__file__', None)
+
+def image_key(project, script):
+    ''' Everything that registration can depend on.
+    '''
+    from hashlib import sha1
+    cls = type(project)
+    state = []
+    for c in cls.__mro__:
+        if c is Project:
+            break
+        slots = c.__dict__.get('__slots__', ())
+        if isinstance(slots, basestring):
+            slots = (slots,)
+        for s in slots:
+            if hasattr(project, s):
+                state.append((s, getattr(project, s)))
+    parts = (sys.version, os.path.abspath(project.srcdir),
+            cls.__module__, cls.__name__, sorted(state),
+            _file_digest(script), attoconf_digest(),
+            local_digest([project.srcdir, os.path.dirname(script)]))
+    return sha1(repr(parts)).hexdigest()
+
+def image_file(project, script=None):
+    ''' Where this project's image lives, or None if images are disabled.
+    '''
+    cache_dir = os.environ.get('ATTOCONF_CACHE_DIR')
+    if not cache_dir:
+        return None
+    if script is None:
+        script = main_script()
+        if script is None:
+            return None
+    return os.path.join(cache_dir, 'images',
+            image_key(project, script) + '.pickle')
+
+def _private(st, dir):
+    if st.st_uid != os.getuid():
+        return False
+    if dir and not stat.S_ISDIR(st.st_mode):
+        return False
+    return not st.st_mode & (0077 if dir else 0022)
+
+def load(project, filename):
+    ''' Fill in the registered parts of project from its image.
+
+        Returns False (with project untouched) if there is no usable image,
+        or if somebody else could have written it.
+    '''
+    import cPickle
+    from cStringIO import StringIO
+    try:
+        if not _private(os.lstat(os.path.dirname(filename)), True):
+            return False
+        with open(filename, 'rb') as f:
+            if not _private(os.fstat(f.fileno()), False):
+                return False
+            # cPickle reads real files a few bytes at a time
+            u = cPickle.Unpickler(StringIO(f.read()))
+        u.persistent_load = {'self': project}.__getitem__
+        data = u.load()
+    except Exception:
+        # missing, stale, corrupt, or refers to something that's gone
+        return False
+    for k in registered:
+        setattr(project, k, data[k])
+    return True
+
+def save(project, filename):
+    ''' Write the registered parts of project, if they can be pickled.
+
+        Returns whether it worked.
+    '''
+    import cPickle, tempfile
+    data = {k: getattr(project, k) for k in registered}
+    dir = os.path.dirname(filename)
+    try:
+        os.makedirs(dir, 0700)
+    except OSError:
+        if not os.path.isdir(dir):
+            return False
+    st = os.lstat(dir)
+    if st.st_uid == os.getuid() and stat.S_ISDIR(st.st_mode):
+        # e.g. made by an older attoconf
+        os.chmod(dir, 0700)
+    elif not _private(st, True):
+        # there's no point, since load() won't trust it
+        return False
+    fd, tmp = tempfile.mkstemp(prefix='.tmp-', dir=dir)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            p = cPickle.Pickler(f, 2)
+            p.persistent_id = lambda obj: 'self' if obj is project else None
+            p.dump(data)
+        os.rename(tmp, filename)
+    except Exception:
+        os.remove(tmp)
+        return False
+    return True
@@ -0,0 +1,305 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import threading
+
+from . import trace
+
+
+def default_jobs():
+    ''' How many probes to run at once if nobody says otherwise.
+    '''
+    try:
+        n = os.sysconf('SC_NPROCESSORS_ONLN')
+    except (AttributeError, ValueError, OSError):
+        n = 1
+    return max(n, 1)
+
+
+class Future(object):
+    ''' The eventual result of a job submitted to a JobPool.
+    '''
+    __slots__ = ('_done', '_result', '_error', 'claimed')
+    def __init__(self):
+        self._done = threading.Event()
+        self._result = None
+        self._error = None
+        # once somebody has looked at the result, it's their problem
+        self.claimed = False
+
+    def done(self):
+        return self._done.is_set()
+
+    def set_result(self, result):
+        self._result = result
+        self._done.set()
+
+    def set_error(self, exc_info):
+        self._error = exc_info
+        self._done.set()
+
+    def succeeded(self):
+        ''' Wait for the job, and say whether it worked.
+
+            Unlike result(), this leaves any error for join() to report.
+        '''
+        self._done.wait()
+        return self._error is None
+
+    def result(self):
+        ''' Wait for the job, then return its value or reraise its exception.
+        '''
+        self._done.wait()
+        self.claimed = True
+        if self._error is not None:
+            t, v, tb = self._error
+            raise t, v, tb
+        return self._result
+
+
+def _worker(queue):
+    while True:
+        future, fn, args = queue.get()
+        try:
+            future.set_result(fn(*args))
+        except BaseException:
+            future.set_error(sys.exc_info())
+
+
+class JobPool(object):
+    ''' A bounded set of worker threads that run independent jobs.
+
+        Threads are only started once there is something to do,
+        so a configure that never probes anything never pays for them.
+    '''
+    __slots__ = ('max_jobs', 'name', '_queue', '_threads', '_pending', '_lock')
+    def __init__(self, max_jobs, name='job'):
+        self.max_jobs = max_jobs
+        self.name = name
+        self._queue = None
+        self._threads = []
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def submit(self, fn, *args):
+        ''' Schedule fn(*args) and return a Future for it.
+
+            With max_jobs == 1 the job is run immediately instead.
+        '''
+        future = Future()
+        with self._lock:
+            self._pending.append(future)
+        if self.max_jobs <= 1:
+            try:
+                future.set_result(fn(*args))
+            except BaseException:
+                future.set_error(sys.exc_info())
+            return future
+        with self._lock:
+            if self._queue is None:
+                from Queue import Queue
+                self._queue = Queue()
+            if len(self._threads) < self.max_jobs:
+                t = threading.Thread(target=_worker, args=(self._queue,),
+                        name='%s-%d' % (self.name, len(self._threads)))
+                t.daemon = True
+                t.start()
+                self._threads.append(t)
+        self._queue.put((future, fn, args))
+        return future
+
+    def join(self):
+        ''' Wait for everything submitted so far.
+
+            If any job failed, the first one (in submission order)
+            has its exception reraised here, unless its result()
+            was already called by whoever submitted it.
+        '''
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+        for future in pending:
+            if not future.claimed:
+                future.result()
+
+    def wait(self):
+        ''' Wait for everything submitted so far, ignoring any errors.
+
+            This is for when something else has already gone wrong.
+        '''
+        with self._lock:
+            pending = self._pending
+            self._pending = []
+        for future in pending:
+            future.succeeded()
+
+
+class _CheckOutput(object):
+    ''' Stand-in for sys.stdout while checks run in several threads.
+
+        Each check's output is kept separately, so it can be replayed
+        in registration order, exactly as if nothing ran concurrently.
+    '''
+    __slots__ = ('real', 'local')
+    def __init__(self, real):
+        self.real = real
+        self.local = threading.local()
+
+    def write(self, s):
+        target = getattr(self.local, 'buffer', None)
+        if target is None:
+            self.real.write(s)
+        else:
+            target.append(s)
+
+    def writelines(self, lines):
+        for s in lines:
+            self.write(s)
+
+    def flush(self):
+        if getattr(self.local, 'buffer', None) is None:
+            self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+
+def check_deps(checks):
+    ''' For each check, the indices of earlier checks it must wait for.
+
+        A check may declare .reads and .writes (sets of var names);
+        it then conflicts with any earlier check that writes what it
+        touches, or that reads what it writes.  A check that does not
+        declare both is assumed to touch everything, i.e. is a barrier.
+    '''
+    deps = []
+    last_barrier = None
+    since_barrier = []
+    last_write = {}
+    reads_since = {}
+    for i, check in enumerate(checks):
+        reads = getattr(check, 'reads', None)
+        writes = getattr(check, 'writes', None)
+        if reads is None or writes is None:
+            d = set(since_barrier)
+            if last_barrier is not None:
+                d.add(last_barrier)
+            deps.append(d)
+            last_barrier = i
+            since_barrier = []
+            last_write = {}
+            reads_since = {}
+            continue
+        d = set()
+        if last_barrier is not None:
+            d.add(last_barrier)
+        for v in reads | writes:
+            if v in last_write:
+                d.add(last_write[v])
+        for v in writes:
+            d.update(reads_since.pop(v, ()))
+        for v in reads:
+            reads_since.setdefault(v, []).append(i)
+        for v in writes:
+            last_write[v] = i
+        since_barrier.append(i)
+        deps.append(d)
+    return deps
+
+
+def run_checks(build, checks, max_jobs, call=None):
+    ''' Run checks, in parallel where their declared vars allow.
+
+        The output and the first error (in registration order)
+        are the same as when running them one after another.
+
+        If given, call(i, check) is used instead of check(build).
+    '''
+    if call is None:
+        call = lambda i, check: check(build)
+    if max_jobs <= 1:
+        for i, check in enumerate(checks):
+            with trace.span(trace.check_name(check), 'check'):
+                call(i, check)
+        return
+
+    n = len(checks)
+    deps = check_deps(checks)
+    waiting = [len(d) for d in deps]
+    dependents = [[] for _ in checks]
+    for i, d in enumerate(deps):
+        for j in d:
+            dependents[j].append(i)
+
+    out = _CheckOutput(sys.stdout)
+    buffers = [None] * n
+    errors = {}
+    from Queue import Queue
+    finished = Queue()
+
+    def work(i):
+        out.local.buffer = buffers[i] = []
+        try:
+            with trace.span(trace.check_name(checks[i]), 'check'):
+                call(i, checks[i])
+        except BaseException:
+            errors[i] = sys.exc_info()
+        finally:
+            out.local.buffer = None
+            finished.put(i)
+
+    ready = [i for i in range(n) if not waiting[i]]
+    done = [False] * n
+    horizon = n
+    running = 0
+    flushed = 0
+    pool = JobPool(max_jobs, 'check')
+    old_stdout = sys.stdout
+    sys.stdout = out
+    try:
+        while True:
+            ready.sort(reverse=True)
+            while ready and running < max_jobs:
+                i = ready.pop()
+                if i > horizon:
+                    continue
+                running += 1
+                pool.submit(work, i)
+            if not running:
+                break
+            i = finished.get()
+            running -= 1
+            done[i] = True
+            if i in errors:
+                horizon = min(horizon, i)
+            else:
+                for j in dependents[i]:
+                    waiting[j] -= 1
+                    if not waiting[j]:
+                        ready.append(j)
+            while flushed < n and done[flushed] and flushed <= horizon:
+                old_stdout.writelines(buffers[flushed])
+                flushed += 1
+    finally:
+        sys.stdout = old_stdout
+    if errors:
+        t, v, tb = errors[min(errors)]
+        raise t, v, tb
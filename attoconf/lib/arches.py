@@ -18,17 +18,21 @@
 from __future__ import print_function, division, absolute_import
 
 from ..classy import ClassyProject
+from ..core import uses
 from ..types import triple, maybe
 
 
+@uses()
 def build(build, BUILD):
     pass
 
+@uses(reads=['BUILD'])
 def host(build, HOST):
     if not HOST:
         BUILD = build.vars['BUILD']
         build.vars['HOST'] = BUILD
 
+@uses(reads=['HOST'])
 def target(build, TARGET):
     if not TARGET:
         HOST = build.vars['HOST']
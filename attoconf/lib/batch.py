@@ -0,0 +1,159 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+from collections import namedtuple, OrderedDict
+import re
+
+from .c import TestError, submit_probe_c, submit_probe_cxx, SYNTAX, LINK
+
+
+# Something that can be tested by compiling (or linking) a snippet.
+#   name: the result key, conventionally HAVE_SOMETHING
+#   headers: files to #include, in order
+#   decls: file-scope declarations
+#   body: statements, run in a function of their own
+#   libs: extra LIBS needed
+#   mode: how far the compiler has to get, e.g. SYNTAX or LINK
+Feature = namedtuple('Feature', ['name', 'headers', 'decls', 'body', 'libs', 'mode'])
+
+def have(s):
+    return 'HAVE_' + re.sub('[^A-Za-z0-9]', '_', s).upper()
+
+def header(h):
+    ''' Whether #include <h> works.
+    '''
+    return Feature(name=have(h), headers=[h], decls='', body='',
+            libs=[], mode=SYNTAX)
+
+def complete_type(t, headers=()):
+    ''' Whether t is a complete type after including headers.
+    '''
+    return Feature(name=have(t), headers=list(headers), decls='',
+            body='(void)sizeof(%s);\n' % t, libs=[], mode=SYNTAX)
+
+def decl(d, headers=()):
+    ''' Whether d is declared (as anything) after including headers.
+    '''
+    return Feature(name=have('decl_' + d), headers=list(headers), decls='',
+            body='(void)%s;\n' % d, libs=[], mode=SYNTAX)
+
+# the volatile store keeps the compiler from optimizing the reference away
+_reference = 'void (*volatile p)(void) = (void (*)(void))%s;\n(void)p;\n'
+
+def function(f, headers=()):
+    ''' Whether f is declared in headers and can be linked against.
+    '''
+    return Feature(name=have(f), headers=list(headers), decls='',
+            body=_reference % f, libs=[], mode=LINK)
+
+_prototype = '''#ifdef __cplusplus
+extern "C"
+#endif
+char %s();
+'''
+
+def library(lib, f):
+    ''' Whether linking with -llib provides the function f.
+
+        Like autoconf, this uses a fake prototype instead of a header.
+    '''
+    return Feature(name=have('lib' + lib), headers=[],
+            decls=_prototype % f, body=_reference % f,
+            libs=['-l' + lib], mode=LINK)
+
+
+def merge(features):
+    ''' Combine several features into a single translation unit.
+
+        Every feature sees every other's headers and decls, so they
+        should all have the same ones (see batch_key).
+    '''
+    out = []
+    seen = set()
+    for f in features:
+        for h in f.headers:
+            if h not in seen:
+                seen.add(h)
+                out.append('#include <%s>\n' % h)
+    for f in features:
+        out.append(f.decls)
+    for i, f in enumerate(features):
+        out.append('static void atto_check_%d(void)\n{\n%s}\n' % (i, f.body))
+    out.append('int main(void)\n{\n')
+    for i, f in enumerate(features):
+        out.append('    atto_check_%d();\n' % i)
+    out.append('    return 0;\n}\n')
+    return ''.join(out)
+
+def batch_key(f):
+    ''' Features with the same key can be tested together.
+
+        Anything one feature brings in (a header, a declaration, a
+        library) could otherwise make another one pass, so only the
+        features that would see exactly the same things are batched;
+        and only those that need the same mode, so a link error from
+        one doesn't make the others be tried again.
+    '''
+    return tuple(f.headers), f.decls, tuple(f.libs), f.mode
+
+def _submit(build, features, lang):
+    body = merge(features)
+    libs = []
+    for f in features:
+        libs.extend(f.libs)
+    mode = max(f.mode for f in features)
+    if lang == 'c':
+        return submit_probe_c(build, mode, body, LIBS=libs)
+    return submit_probe_cxx(build, mode, body, LIBS=libs)
+
+def check_features(build, features, lang='c'):
+    ''' Test a bunch of independent features, as cheaply as possible.
+
+        The features with the same batch_key are first tried together
+        in a single compile.  If that fails, the batch is split in half
+        and both halves are tried (in parallel), and so on, until every
+        failure is isolated.  So if everything works (the common case),
+        it only costs one compiler run per kind of feature, instead of
+        one per feature.
+
+        Returns an OrderedDict from name to True or False.
+    '''
+    assert lang in ('c', 'c++')
+    results = OrderedDict((f.name, None) for f in features)
+    batches = OrderedDict()
+    for f in features:
+        batches.setdefault(batch_key(f), []).append(f)
+    groups = batches.values()
+    while groups:
+        submitted = [(g, _submit(build, g, lang)) for g in groups]
+        groups = []
+        for g, future in submitted:
+            try:
+                future.result()
+            except TestError:
+                if len(g) == 1:
+                    results[g[0].name] = False
+                    continue
+                half = len(g) // 2
+                groups.append(g[:half])
+                groups.append(g[half:])
+            else:
+                for f in g:
+                    results[f.name] = True
+    return results
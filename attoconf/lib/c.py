@@ -19,20 +19,32 @@ from __future__ import print_function, division, absolute_import
 
 import errno
 import os
-import subprocess
+import threading
+import time
 
 from .arches import Arches2
-from ..types import ShellList
+from .cache import cache_key, cached_exec, get_cache, Cached
+from ..core import uses
+from ..types import FlagList, ShellList, ShellCommand
 
 class TestError(Exception):
     pass
 
-def do_exec(build, args):
-    p = subprocess.Popen(args.list, cwd=build.builddir,
-            stdin=subprocess.PIPE, stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT)
-    out, _ = p.communicate()
-    retcode = p.wait()
+def do_exec(build, args, input=None):
+    import subprocess
+    from .. import trace
+    start = time.time()
+    with trace.span(os.path.basename(args.list[0]), 'exec',
+            argv=args.list) as span:
+        p = subprocess.Popen(args.list, cwd=build.builddir, env=build.env,
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT)
+        out, _ = p.communicate(input)
+        retcode = p.wait()
+        span.args['status'] = retcode
+    if build.log is not None:
+        build.log.command(args.list, build.builddir, start,
+                time.time() - start, retcode, out, input)
     return retcode, out
 
 
@@ -61,64 +73,195 @@ class TempFile:
                 raise
 
 
-def try_compile_c(build, body, CFLAGS=[], CPPFLAGS=[]):
-    CC = build.vars['CC']
-    CFLAGS = build.vars['CFLAGS'] + CFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    in_ = 'atto-test.c'
-    ins = [in_]
-    out = 'atto-test.o'
-
-    args = CC + CFLAGS + CPPFLAGS + ['-c', '-o', out, in_]
-    with TempFile(in_, body), TempFile(out, None):
-        status, error = do_exec(build, args)
-    if status:
-        raise TestError(error)
+# What a probe actually needs to know, from cheapest to dearest.
+# If some code passes in one mode, it passes in all weaker modes too.
+PREPROCESS = 0
+SYNTAX = 1
+CODEGEN = 2
+LINK = 3
 
-def try_compile_link_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
-    CC = build.vars['CC']
-    CFLAGS = build.vars['CFLAGS'] + CFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    LDFLAGS = build.vars['LDFLAGS'] + LDFLAGS
-    LIBS = build.vars['LIBS'] + LIBS
-    in_ = 'atto-test.c'
-    ins = [in_]
-    out = 'atto-test'
-
-    args = CC + CFLAGS + CPPFLAGS + LDFLAGS + ins + LIBS + ['-o', out]
-    with TempFile(in_, body), TempFile(out, None):
-        status, error = do_exec(build, args)
-    if status:
-        raise TestError(error)
 
-def try_compile_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
-    CXX = build.vars['CXX']
-    CXXFLAGS = build.vars['CXXFLAGS'] + CXXFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    in_ = 'atto-test.cxx'
-    out = 'atto-test.o'
+class Probe(object):
+    ''' A test compilation, fed its source on stdin.
 
-    args = CXX + CXXFLAGS + CPPFLAGS + ['-c', '-o', out, in_]
-    with TempFile(in_, body), TempFile(out, None):
-        status, error = do_exec(build, args)
-    if status:
-        raise TestError(error)
+        Anything that has to be written (only objects and executables)
+        goes in a private scratch directory under the build dir, so any
+        number of probes may run at once without fighting over files.
+        Commands still run from the build dir, so relative -I flags work.
+    '''
+    __slots__ = ('build', 'tool', 'body', 'steps', 'scratch')
+
+    def __init__(self, build, tool, body):
+        self.build = build
+        self.tool = tool
+        self.body = body
+        self.steps = []
+        self.scratch = None
+
+    def path(self, name):
+        ''' Absolute name of a file in this probe's scratch directory.
+        '''
+        if self.scratch is None:
+            import tempfile
+            self.scratch = tempfile.mkdtemp(prefix='atto-test-',
+                    dir=os.path.abspath(self.build.builddir))
+        return os.path.join(self.scratch, name)
+
+    def add(self, args, stdin):
+        ''' Append a command to be run, optionally with the body as stdin.
+        '''
+        self.steps.append((args, stdin))
+
+    def key(self):
+        ''' What the result depends on, independent of the scratch dir.
+        '''
+        from .fingerprint import fingerprint
+        steps = [(args.list, stdin) for args, stdin in self.steps]
+        if self.scratch is not None:
+            steps = [([a.replace(self.scratch, '@SCRATCH@') for a in args],
+                    stdin) for args, stdin in steps]
+        return cache_key('probe', fingerprint(self.build, self.tool),
+                steps, self.body)
+
+    def run(self, unless=None):
+        ''' Run the commands, unless some other probe already proved
+            that they would succeed.
+        '''
+        try:
+            if unless is not None and unless.succeeded():
+                return
+            if get_cache(self.build) is None:
+                status, error = self._run()
+            else:
+                status, error = cached_exec(self.build, self.key(), self._run)
+        finally:
+            if self.scratch is not None:
+                import shutil
+                shutil.rmtree(self.scratch, ignore_errors=True)
+        if status:
+            raise TestError(error)
 
-def try_compile_link_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    def _run(self):
+        for args, stdin in self.steps:
+            status, error = do_exec(self.build, args,
+                    self.body if stdin else None)
+            if status:
+                return status, error
+        return 0, ''
+
+    def submit(self, unless=None):
+        ''' Run in the background; failure is reported by build.join().
+        '''
+        return self.build.jobs.submit(self.run, unless)
+
+
+_probes_lock = threading.Lock()
+
+def submit_probe(build, lang, mode, body, tool, FLAGS, CPPFLAGS,
+        LDFLAGS=[], LIBS=[], split=False):
+    ''' Submit a probe that tests no more than it has to, and return
+        a future for its result.  If nobody calls its result(),
+        a failure is reported by build.join().
+
+        The mode says what is being tested: PREPROCESS runs just -E,
+        SYNTAX uses -fsyntax-only, CODEGEN compiles to /dev/null, and
+        LINK compiles and links an executable (in one step, or in two
+        if split is true, like make's implicit rules do).
+
+        If a probe of at least the same mode was already submitted for
+        the same code and flags, this one only runs if that one fails.
+    '''
+    x = ['-x', lang, '-']
+    compile = tool + FLAGS + CPPFLAGS
+    probe = Probe(build, tool, body)
+    if mode == PREPROCESS:
+        probe.add(compile + ['-E'] + x + ['-o', os.devnull], True)
+    elif mode == SYNTAX:
+        probe.add(compile + ['-fsyntax-only'] + x, True)
+    elif mode == CODEGEN:
+        probe.add(compile + ['-pipe', '-c'] + x + ['-o', os.devnull], True)
+    elif not split:
+        # -x none so that LIBS may contain .a files
+        probe.add(compile + LDFLAGS + ['-pipe'] + x + ['-x', 'none']
+                + LIBS + ['-o', probe.path('atto-test')], True)
+    else:
+        mid = probe.path('atto-test.o')
+        probe.add(compile + ['-pipe', '-c'] + x + ['-o', mid], True)
+        probe.add(tool + LDFLAGS + [mid] + LIBS
+                + ['-o', probe.path('atto-test')], False)
+
+    compile_key = (lang, tuple(compile.list), body)
+    link_key = None
+    if mode == LINK:
+        link_key = (split, tuple((ShellList(LDFLAGS) + LIBS).list))
+    with _probes_lock:
+        earlier = build.probes.setdefault(compile_key, [])
+        for m, lk, future in earlier:
+            if m >= mode and (mode != LINK or lk == link_key):
+                stronger = future
+                break
+        else:
+            stronger = None
+        future = probe.submit(stronger)
+        earlier.append((mode, link_key, future))
+    return future
+
+def try_probe(build, lang, mode, body, tool, FLAGS, CPPFLAGS,
+        LDFLAGS=[], LIBS=[], split=False):
+    ''' Like submit_probe, but wait for it, raising TestError on failure.
+    '''
+    submit_probe(build, lang, mode, body, tool, FLAGS, CPPFLAGS,
+            LDFLAGS, LIBS, split).result()
+
+def _with(build, var, extra):
+    # most probes add nothing, so don't copy the flags for them
+    if extra:
+        return build.vars[var] + extra
+    return build.vars[var]
+
+def submit_probe_c(build, mode, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[], split=False):
+    CC = build.vars['CC']
+    CFLAGS = _with(build, 'CFLAGS', CFLAGS)
+    CPPFLAGS = _with(build, 'CPPFLAGS', CPPFLAGS)
+    if mode == LINK:
+        LDFLAGS = _with(build, 'LDFLAGS', LDFLAGS)
+        LIBS = _with(build, 'LIBS', LIBS)
+    return submit_probe(build, 'c', mode, body, CC, CFLAGS, CPPFLAGS,
+            LDFLAGS, LIBS, split)
+
+def submit_probe_cxx(build, mode, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[], split=False):
     CXX = build.vars['CXX']
-    CXXFLAGS = build.vars['CXXFLAGS'] + CXXFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    LDFLAGS = build.vars['LDFLAGS'] + LDFLAGS
-    LIBS = build.vars['LIBS'] + LIBS
-    in_ = 'atto-test.cxx'
-    ins = [in_]
-    out = 'atto-test'
-
-    args = CXX + CXXFLAGS + CPPFLAGS + LDFLAGS + ins + LIBS + ['-o', out]
-    with TempFile(in_, body), TempFile(out, None):
-        status, error = do_exec(build, args)
-    if status:
-        raise TestError(error)
+    CXXFLAGS = _with(build, 'CXXFLAGS', CXXFLAGS)
+    CPPFLAGS = _with(build, 'CPPFLAGS', CPPFLAGS)
+    if mode == LINK:
+        LDFLAGS = _with(build, 'LDFLAGS', LDFLAGS)
+        LIBS = _with(build, 'LIBS', LIBS)
+    return submit_probe(build, 'c++', mode, body, CXX, CXXFLAGS, CPPFLAGS,
+            LDFLAGS, LIBS, split)
+
+def submit_preprocess_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_c(build, PREPROCESS, body, CFLAGS, CPPFLAGS)
+
+def submit_syntax_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_c(build, SYNTAX, body, CFLAGS, CPPFLAGS)
+
+def submit_compile_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_c(build, CODEGEN, body, CFLAGS, CPPFLAGS)
+
+def submit_compile_link_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    return submit_probe_c(build, LINK, body, CFLAGS, CPPFLAGS, LDFLAGS, LIBS)
+
+def submit_preprocess_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_cxx(build, PREPROCESS, body, CXXFLAGS, CPPFLAGS)
+
+def submit_syntax_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_cxx(build, SYNTAX, body, CXXFLAGS, CPPFLAGS)
+
+def submit_compile_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    return submit_probe_cxx(build, CODEGEN, body, CXXFLAGS, CPPFLAGS)
+
+def submit_compile_link_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    return submit_probe_cxx(build, LINK, body, CXXFLAGS, CPPFLAGS, LDFLAGS, LIBS)
 
 if 0:
     def try_linkonly_c(build, ins, LDFLAGS=[], LIBS=[]):
@@ -133,30 +276,9 @@ if 0:
         if status:
             raise TestError(error)
 
-def try_compile_link2_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
-    CC = build.vars['CC']
-    CFLAGS = build.vars['CFLAGS'] + CFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    LDFLAGS = build.vars['LDFLAGS'] + LDFLAGS
-    LIBS = build.vars['LIBS'] + LIBS
-    in_ = 'atto-test.c'
-    ins = [in_]
-    mid = 'atto-test.o'
-    mids = [mid]
-    out = 'atto-test'
-
-    args1 = CC + CFLAGS + CPPFLAGS + ['-c', '-o', mid, in_]
-    args2 = CC + LDFLAGS + mids + LIBS + ['-o', out]
-    with TempFile(mid, None):
-        with TempFile(in_, body):
-            status, error = do_exec(build, args1)
-        if status:
-            raise TestError(error)
-
-        with TempFile(out, None):
-            status, error = do_exec(build, args2)
-        if status:
-            raise TestError(error)
+def submit_compile_link2_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    return submit_probe_c(build, LINK, body, CFLAGS, CPPFLAGS, LDFLAGS, LIBS,
+            split=True)
 
 if 0:
     def try_linkonly_cxx(build, ins, LDFLAGS=[], LIBS=[]):
@@ -171,42 +293,265 @@ if 0:
         if status:
             raise TestError(error)
 
+def submit_compile_link2_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    return submit_probe_cxx(build, LINK, body, CXXFLAGS, CPPFLAGS, LDFLAGS, LIBS,
+            split=True)
+
+
+# The same, but waiting for the result: they raise TestError on failure,
+# so a check can use try ... except TestError.
+
+def try_probe_c(build, mode, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[], split=False):
+    submit_probe_c(build, mode, body, CFLAGS, CPPFLAGS, LDFLAGS, LIBS, split).result()
+
+def try_probe_cxx(build, mode, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[], split=False):
+    submit_probe_cxx(build, mode, body, CXXFLAGS, CPPFLAGS, LDFLAGS, LIBS, split).result()
+
+def try_preprocess_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    submit_preprocess_c(build, body, CFLAGS, CPPFLAGS).result()
+
+def try_syntax_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    submit_syntax_c(build, body, CFLAGS, CPPFLAGS).result()
+
+def try_compile_c(build, body, CFLAGS=[], CPPFLAGS=[]):
+    submit_compile_c(build, body, CFLAGS, CPPFLAGS).result()
+
+def try_compile_link_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    submit_compile_link_c(build, body, CFLAGS, CPPFLAGS, LDFLAGS, LIBS).result()
+
+def try_compile_link2_c(build, body, CFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    submit_compile_link2_c(build, body, CFLAGS, CPPFLAGS, LDFLAGS, LIBS).result()
+
+def try_preprocess_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    submit_preprocess_cxx(build, body, CXXFLAGS, CPPFLAGS).result()
+
+def try_syntax_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    submit_syntax_cxx(build, body, CXXFLAGS, CPPFLAGS).result()
+
+def try_compile_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[]):
+    submit_compile_cxx(build, body, CXXFLAGS, CPPFLAGS).result()
+
+def try_compile_link_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    submit_compile_link_cxx(build, body, CXXFLAGS, CPPFLAGS, LDFLAGS, LIBS).result()
+
 def try_compile_link2_cxx(build, body, CXXFLAGS=[], CPPFLAGS=[], LDFLAGS=[], LIBS=[]):
+    submit_compile_link2_cxx(build, body, CXXFLAGS, CPPFLAGS, LDFLAGS, LIBS).result()
+
+
+class Macros(object):
+    ''' The macros a compiler predefines (for some flags), from -dM -E.
+
+        Many questions about the target and the compiler can be answered
+        from these, without a probe for each one.  If the compiler
+        couldn't be asked, there are no macros, so the answers are
+        all "no" or None.
+    '''
+    __slots__ = ('defs')
+    def __init__(self, defs):
+        # name -> replacement; function-like macros lose their params
+        self.defs = defs
+
+    @staticmethod
+    def parse(text):
+        import re
+        defs = {}
+        for m in re.finditer(r'^#define (\w+)(?:\([^)]*\))? ?(.*)$',
+                text, re.M):
+            defs[m.group(1)] = m.group(2)
+        return Macros(defs)
+
+    def defined(self, name):
+        return name in self.defs
+
+    def value(self, name, default=None):
+        return self.defs.get(name, default)
+
+    def int_value(self, name, default=None):
+        ''' The value of a macro that is an integer literal
+            (or another macro that is one), or default.
+        '''
+        val = self.defs.get(name)
+        seen = set()
+        while val in self.defs and val not in seen:
+            seen.add(val)
+            val = self.defs[val]
+        if val is None:
+            return default
+        try:
+            return int(val.rstrip('uUlL'), 0)
+        except ValueError:
+            return default
+
+    def pointer_size(self):
+        size = self.int_value('__SIZEOF_POINTER__')
+        if size is None:
+            if self.defined('__LP64__') or self.defined('_LP64'):
+                return 8
+            if self.defined('__ILP32__') or self.defined('_ILP32'):
+                return 4
+        return size
+
+    def endianness(self):
+        ''' 'little', 'big', 'pdp' or None.
+        '''
+        order = self.int_value('__BYTE_ORDER__')
+        if order is not None:
+            for name in ['little', 'big', 'pdp']:
+                if order == self.int_value('__ORDER_%s_ENDIAN__' % name.upper()):
+                    return name
+        if self.defined('__LITTLE_ENDIAN__'):
+            return 'little'
+        if self.defined('__BIG_ENDIAN__'):
+            return 'big'
+        return None
+
+    def arch(self):
+        ''' The target CPU family, using the names from GNU triplets.
+        '''
+        if self.defined('__riscv'):
+            return 'riscv%d' % self.int_value('__riscv_xlen', 32)
+        for name, macro in _arch_macros:
+            if self.defined(macro):
+                return name
+        return None
+
+    def compiler(self):
+        ''' (family, version) of the compiler, or (None, None).
+        '''
+        def version(*names):
+            parts = [self.int_value(n) for n in names]
+            return '.'.join(str(p) for p in parts if p is not None)
+        # most of these pretend to be gcc too, so check for it last
+        if self.defined('__INTEL_LLVM_COMPILER'):
+            return 'icx', self.value('__VERSION__', '').strip('"')
+        if self.defined('__clang__'):
+            family = 'apple-clang' if self.defined('__apple_build_version__') else 'clang'
+            return family, version('__clang_major__', '__clang_minor__',
+                    '__clang_patchlevel__')
+        if self.defined('__TINYC__'):
+            v = self.int_value('__TINYC__', 0)
+            return 'tcc', '%d.%d.%d' % (v // 10000, v // 100 % 100, v % 100)
+        if self.defined('__GNUC__'):
+            return 'gcc', version('__GNUC__', '__GNUC_MINOR__',
+                    '__GNUC_PATCHLEVEL__')
+        return None, None
+
+# more specific first, since e.g. __x86_64__ compilers may define __i386__
+_arch_macros = [
+    ('x86_64', '__x86_64__'),
+    ('i386', '__i386__'),
+    ('aarch64', '__aarch64__'),
+    ('arm', '__arm__'),
+    ('powerpc64', '__powerpc64__'),
+    ('powerpc', '__powerpc__'),
+    ('mips64', '__mips64'),
+    ('mips', '__mips__'),
+    ('s390x', '__s390x__'),
+    ('loongarch64', '__loongarch64'),
+    ('sparc64', '__sparc_v9__'),
+    ('sparc', '__sparc__'),
+    ('wasm32', '__wasm32__'),
+]
+
+# cache key -> Macros, so each set is only parsed once per process
+_macros = {}
+_macros_lock = threading.Lock()
+
+def _included(build, args):
+    ''' The files that -include and -imacros in args name,
+        relative to the build dir like the commands are run.
+    '''
+    files = []
+    for opt, arg in zip(args, args[1:]):
+        if opt in ('-include', '-imacros'):
+            files.append(os.path.join(build.builddir, arg))
+    return files
+
+def _contents(path):
+    try:
+        with open(path) as f:
+            return f.read()
+    except IOError:
+        return None
+
+def predefined_macros(build, lang, tool, FLAGS, CPPFLAGS):
+    ''' Ask the compiler what it predefines with these flags.
+
+        The answer is cached (in the probe cache too, if enabled)
+        by the compiler's fingerprint, the exact command, and the
+        contents of any headers that the flags -include.
+    '''
+    from .fingerprint import fingerprint
+    args = tool + FLAGS + CPPFLAGS + ['-dM', '-E', '-x', lang, '-']
+    included = _included(build, args.list)
+    build.files.update(included)
+    key = cache_key('macros', fingerprint(build, tool), args.list,
+            [_contents(path) for path in included])
+    with _macros_lock:
+        macros = _macros.get(key)
+    if macros is None:
+        def ask():
+            # a missing compiler is reported by the probes instead
+            try:
+                return do_exec(build, args, '')
+            except OSError as e:
+                return 1, str(e)
+        status, out = cached_exec(build, key, ask)
+        macros = Macros.parse(out) if not status else Macros({})
+        with _macros_lock:
+            _macros[key] = macros
+    return macros
+
+def c_macros(build, CFLAGS=[], CPPFLAGS=[]):
+    CC = build.vars['CC']
+    CFLAGS = _with(build, 'CFLAGS', CFLAGS)
+    CPPFLAGS = _with(build, 'CPPFLAGS', CPPFLAGS)
+    return predefined_macros(build, 'c', CC, CFLAGS, CPPFLAGS)
+
+def cxx_macros(build, CXXFLAGS=[], CPPFLAGS=[]):
     CXX = build.vars['CXX']
-    CXXFLAGS = build.vars['CXXFLAGS'] + CXXFLAGS
-    CPPFLAGS = build.vars['CPPFLAGS'] + CPPFLAGS
-    LDFLAGS = build.vars['LDFLAGS'] + LDFLAGS
-    LIBS = build.vars['LIBS'] + LIBS
-    in_ = 'atto-test.cxx'
-    ins = [in_]
-    mid = 'atto-test.o'
-    mids = [mid]
-    out = 'atto-test'
-
-    args1 = CXX + CXXFLAGS + CPPFLAGS + ['-c', '-o', mid, in_]
-    args2 = CXX + LDFLAGS + mids + LIBS + ['-o', out]
-    with TempFile(mid, None):
-        with TempFile(in_, body):
-            status, error = do_exec(build, args1)
-        if status:
-            raise TestError(error)
+    CXXFLAGS = _with(build, 'CXXFLAGS', CXXFLAGS)
+    CPPFLAGS = _with(build, 'CPPFLAGS', CPPFLAGS)
+    return predefined_macros(build, 'c++', CXX, CXXFLAGS, CPPFLAGS)
 
-        with TempFile(out, None):
-            status, error = do_exec(build, args2)
-        if status:
-            raise TestError(error)
+def fact_vars(prefix, names=()):
+    ''' The vars that export_facts() sets.
+    '''
+    return [prefix + '_' + f for f in
+            ['FAMILY', 'VERSION', 'ARCH', 'ENDIAN', 'SIZEOF_POINTER']] + \
+            [prefix + '_MACRO_' + name for name in names]
 
+def export_facts(build, prefix, macros, names=()):
+    ''' Set vars for what is known about a compiler, '' if nothing.
 
+        The macros in names are exported too, as e.g. CC_MACRO___SSE2__,
+        so they can't be mistaken for (or clash with) anything else.
+    '''
+    family, version = macros.compiler()
+    facts = [family, version, macros.arch(), macros.endianness(),
+            macros.pointer_size()]
+    facts += [macros.value(name) for name in names]
+    for var, val in zip(fact_vars(prefix, names), facts):
+        build.vars[var] = str(val) if val is not None else ''
+    if family is not None:
+        print('Found %s: %s %s for %s' % (prefix, family, version,
+                macros.arch() or 'an unknown arch'))
+
+
+@uses()
 def ldflags(build, LDFLAGS):
     pass
 
+@uses(writes=['LDLIBS'])
 def libs(build, LIBS):
     # compatibility
-    build.vars['LDLIBS'] = LIBS
+    build.vars['LDLIBS'] = LIBS.copy()
 
+@uses()
 def cppflags(build, CPPFLAGS):
     pass
 
+@uses(reads=['HOST'])
 def cc(build, CC):
     if CC.list == []:
         HOST = build.vars['HOST']
@@ -215,11 +560,15 @@ def cc(build, CC):
         else:
             build.vars['CC'].list = ['gcc']
 
+@uses(reads=['CC', 'CPPFLAGS', 'LDFLAGS', 'LIBS'])
 def cflags(build, CFLAGS):
-    try_compile_c(build, 'int main() {}\n')
-    try_compile_link_c(build, 'int main() {}\n')
-    try_compile_link2_c(build, 'int main() {}\n')
+    # these are only submitted here; build.join() collects the results
+    # strongest first, so that weaker ones can be skipped if they pass
+    submit_compile_link2_c(build, 'int main() {}\n')
+    submit_compile_link_c(build, 'int main() {}\n')
+    submit_compile_c(build, 'int main() {}\n')
 
+@uses(reads=['HOST'])
 def cxx(build, CXX):
     if CXX.list == []:
         HOST = build.vars['HOST']
@@ -228,21 +577,36 @@ def cxx(build, CXX):
         else:
             build.vars['CXX'].list = ['g++']
 
+@uses(reads=['CXX', 'CPPFLAGS', 'LDFLAGS', 'LIBS'])
 def cxxflags(build, CXXFLAGS):
-    try_compile_cxx(build, 'int main() {}\n')
-    try_compile_link_cxx(build, 'int main() {}\n')
-    try_compile_link2_cxx(build, 'int main() {}\n')
+    submit_compile_link2_cxx(build, 'int main() {}\n')
+    submit_compile_link_cxx(build, 'int main() {}\n')
+    submit_compile_cxx(build, 'int main() {}\n')
+
+class FactsCheck(object):
+    ''' Export what a compiler predefines, see export_facts().
+    '''
+    __slots__ = ('prefix', 'get_macros', 'names', 'reads', 'writes')
+    def __init__(self, prefix, flags, get_macros, names):
+        self.prefix = prefix
+        self.get_macros = get_macros
+        self.names = names
+        self.reads = frozenset([prefix, flags, 'CPPFLAGS'])
+        self.writes = frozenset(fact_vars(prefix, names))
+
+    def __call__(self, build):
+        export_facts(build, self.prefix, self.get_macros(build), self.names)
 
 class Link(Arches2):
     __slots__ = ()
     def vars(self):
         super(Link, self).vars()
         self.add_option('LDFLAGS', init=[],
-                type=ShellList, check=ldflags,
+                type=FlagList, check=ldflags,
                 help='linker flags, e.g. -L<lib dir> if you have libraries in a nonstandard directory <lib dir>',
                 hidden=False)
         self.add_option('LIBS', init=[],
-                type=ShellList, check=libs,
+                type=FlagList, check=libs,
                 help='libraries to pass to the linker, e.g. -l<library>',
                 hidden=False)
         self.order.append('LDLIBS') #TODO remove for 1.0
@@ -252,30 +616,59 @@ class Preprocess(Arches2):
     def vars(self):
         super(Preprocess, self).vars()
         self.add_option('CPPFLAGS', init=[],
-                type=ShellList, check=cppflags,
+                type=FlagList, check=cppflags,
                 help='C/C++/Objective C preprocessor flags, e.g. -I<include dir> if you have headers in a nonstandard directory <include dir>',
                 hidden=False)
 
-class C(Link, Preprocess):
+class C(Link, Preprocess, Cached):
+    ''' Find a C compiler.
+
+        The predefined macros named in export_cc_macros are exported,
+        see export_facts().
+    '''
     __slots__ = ()
+    _merge_slots_ = ('export_cc_macros',)
+    # for checks of the target or compiler, see Macros
+    c_macros = staticmethod(c_macros)
+
+    def __init__(self, *args, **kwargs):
+        # optional, and not in the way of srcdir etc.
+        self.export_cc_macros = list(kwargs.pop('export_cc_macros', ()))
+        super(C, self).__init__(*args, **kwargs)
+
     def vars(self):
         super(C, self).vars()
         self.add_option('CC', init=[],
-                type=ShellList, check=cc,
+                type=ShellCommand, check=cc,
                 help='C compiler command', hidden=False,
                 help_def='HOST-gcc')
         self.add_option('CFLAGS', init=['-O2', '-g'],
-                type=ShellList, check=cflags,
+                type=FlagList, check=cflags,
                 help='C compiler flags', hidden=False)
+        self.order.extend(fact_vars('CC', self.export_cc_macros))
+        self.checks.append(FactsCheck('CC', 'CFLAGS', c_macros,
+                self.export_cc_macros))
 
-class Cxx(Link, Preprocess):
+class Cxx(Link, Preprocess, Cached):
+    ''' Find a C++ compiler, see C.
+    '''
     __slots__ = ()
+    _merge_slots_ = ('export_cxx_macros',)
+    cxx_macros = staticmethod(cxx_macros)
+
+    def __init__(self, *args, **kwargs):
+        self.export_cxx_macros = list(kwargs.pop('export_cxx_macros', ()))
+        super(Cxx, self).__init__(*args, **kwargs)
+
     def vars(self):
         super(Cxx, self).vars()
         self.add_option('CXX', init=[],
-                type=ShellList, check=cxx,
+                type=ShellCommand, check=cxx,
                 help='C++ compiler command', hidden=False,
                 help_def='HOST-g++')
         self.add_option('CXXFLAGS', init=['-O2', '-g'],
-                type=ShellList, check=cxxflags,
+                type=FlagList, check=cxxflags,
                 help='C++ compiler flags', hidden=False)
+        self.order.extend(fact_vars('CXX', self.export_cxx_macros))
+        self.checks.append(FactsCheck('CXX', 'CXXFLAGS', cxx_macros,
+                self.export_cxx_macros))
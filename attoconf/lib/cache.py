@@ -0,0 +1,221 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import errno
+import os
+import threading
+import time
+
+from ..classy import ClassyProject
+
+
+def cache_key(*parts):
+    ''' Digest anything that affects the result of an external command.
+    '''
+    from hashlib import sha1
+    return sha1(repr(parts)).hexdigest()
+
+
+class _Lock(object):
+    ''' flock()-based context manager, so separate configures can share.
+    '''
+    __slots__ = ('filename', 'mode', 'fd')
+    def __init__(self, filename, mode):
+        self.filename = filename
+        self.mode = mode
+        self.fd = None
+
+    def __enter__(self):
+        import fcntl
+        self.fd = os.open(self.filename, os.O_RDWR | os.O_CREAT, 0666)
+        fcntl.flock(self.fd, self.mode)
+
+    def __exit__(self, type, value, traceback):
+        # closing releases the lock
+        os.close(self.fd)
+        self.fd = None
+
+
+class ProbeCache(object):
+    ''' A persistent, size-bounded LRU cache of command results.
+
+        The file is read once when opened and merged back by save().
+        Entries are [last use, output, status]; the least recently used
+        ones are evicted once the total output size exceeds max_size.
+    '''
+    __slots__ = ('filename', 'max_size', 'entries', '_used', '_lock')
+    def __init__(self, filename, max_size=1 << 20):
+        self.filename = filename
+        self.max_size = max_size
+        self._used = {}
+        self._lock = threading.Lock()
+        d = os.path.dirname(filename)
+        if d and not os.path.isdir(d):
+            try:
+                os.makedirs(d)
+            except OSError as e:
+                if e.errno != errno.EEXIST:
+                    raise
+        import fcntl
+        with _Lock(filename + '.lock', fcntl.LOCK_SH):
+            self.entries = self._load()
+
+    def _load(self):
+        import json
+        try:
+            with open(self.filename) as f:
+                data = json.load(f)
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                raise
+            return {}
+        except ValueError:
+            # corrupt or from an incompatible version; start over
+            return {}
+        return data.get('entries', {})
+
+    def get(self, key):
+        ''' Return the cached (status, output), or None if not cached.
+        '''
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return None
+            # older files only had successes, without a status
+            status = entry[2] if len(entry) > 2 else 0
+            self._used[key] = entry = [time.time(), entry[1], status]
+            self.entries[key] = entry
+        # json gives unicode back; see put()
+        return status, entry[1].encode('latin-1')
+
+    def put(self, key, status, output):
+        ''' Remember the exit status and output of a command.
+        '''
+        # latin-1 round-trips arbitrary bytes through json
+        entry = [time.time(), output.decode('latin-1'), status]
+        with self._lock:
+            self.entries[key] = self._used[key] = entry
+
+    def save(self):
+        ''' Merge this run's entries into the file and evict old ones.
+        '''
+        with self._lock:
+            used = self._used
+            self._used = {}
+        if not used:
+            return
+        import fcntl, json, tempfile
+        with _Lock(self.filename + '.lock', fcntl.LOCK_EX):
+            # somebody else may have saved since we loaded
+            entries = self._load()
+            for key, entry in used.iteritems():
+                old = entries.get(key)
+                if old is None or old[0] < entry[0]:
+                    entries[key] = entry
+            size = 0
+            keep = {}
+            for key, entry in sorted(entries.iteritems(),
+                    key=lambda kv: kv[1][0], reverse=True):
+                size += len(key) + len(entry[1])
+                if size > self.max_size:
+                    break
+                keep[key] = entry
+            fd, tmp = tempfile.mkstemp(prefix='.tmp-',
+                    dir=os.path.dirname(os.path.abspath(self.filename)))
+            umask = os.umask(0)
+            os.umask(umask)
+            try:
+                # mkstemp is 0600, but the point is to share it
+                os.fchmod(fd, 0666 & ~umask)
+                with os.fdopen(fd, 'w') as f:
+                    json.dump({'version': 1, 'entries': keep}, f)
+                os.rename(tmp, self.filename)
+            except:
+                os.remove(tmp)
+                raise
+            self.entries = keep
+
+
+_open_lock = threading.Lock()
+
+def get_cache(build):
+    ''' Return the build's probe cache, or None if caching is disabled.
+
+        The cache is --cache-file if given (relative to the build dir),
+        otherwise a file in $ATTOCONF_CACHE_DIR (from the build's env,
+        relative to the current directory), which lets many build dirs
+        share it.
+    '''
+    with _open_lock:
+        return _get_cache(build)
+
+def _get_cache(build):
+    if build.cache is None:
+        filename = build.vars.get('CACHE_FILE')
+        if not filename:
+            cache_dir = build.env.get('ATTOCONF_CACHE_DIR')
+            if cache_dir:
+                filename = os.path.join(os.path.abspath(cache_dir),
+                        'probes.cache')
+        if filename:
+            build.cache = ProbeCache(os.path.join(build.builddir, filename))
+        else:
+            build.cache = False
+    return build.cache or None
+
+
+def cached_exec(build, key, run):
+    ''' Return the cached (status, output) for key, or call run()
+        to get them and cache them.
+
+        Failures are cached too, since they are just as deterministic,
+        except for commands killed by a signal (e.g. ^C).
+    '''
+    cache = get_cache(build)
+    if cache is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result
+    status, out = run()
+    if cache is not None and status >= 0:
+        cache.put(key, status, out)
+    return status, out
+
+
+def save_cache(build):
+    cache = get_cache(build)
+    if cache is not None:
+        cache.save()
+
+
+class Cached(ClassyProject):
+    ''' Allow the results of probes to be reused between configure runs.
+    '''
+    __slots__ = ()
+
+    def general(self):
+        super(Cached, self).general()
+        self.add_option('--cache-file', init='',
+                type=str, check=None,
+                help='cache test results in FILE', hidden=False,
+                help_var='FILE', help_def='$ATTOCONF_CACHE_DIR/probes.cache')
+
+    def post(self):
+        super(Cached, self).post()
+        self.checks.append(save_cache)
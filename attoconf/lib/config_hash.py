@@ -17,16 +17,28 @@
 
 from __future__ import print_function, division, absolute_import
 
-from hashlib import md5
 import os
 
 from ..classy import ClassyProject
+from ..core import as_var
+from ..types import ShellCommand
 
 
 def calc_hash(build):
+    from .fingerprint import fingerprint
+    # options without a check (--help, --cache-file, ...) do not
+    # affect the output, so they must not affect the hash either
+    order = set(build.project.order)
+    skip = {as_var(k) for k in build.project.options} - order
+    from hashlib import md5
     hash = md5()
     for var, val in sorted(build.vars.iteritems()):
+        if var in skip:
+            continue
         hash.update('%s = %s\n' % (var, val))
+        if isinstance(val, ShellCommand):
+            # same name, different compiler? must rebuild anyway
+            hash.update('%s is %s\n' % (var, fingerprint(build, val)))
     return hash.hexdigest()
 
 
@@ -0,0 +1,107 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import threading
+
+from .cache import cache_key, cached_exec
+
+
+def which(name, env):
+    ''' Find a program the same way execvp() would, or return None.
+
+        The PATH is looked up in env, which is what it will be run with.
+    '''
+    if '/' in name:
+        candidates = [name]
+    else:
+        path = env.get('PATH', os.defpath)
+        candidates = [os.path.join(d or '.', name) for d in path.split(':')]
+    for c in candidates:
+        if os.path.isfile(c) and os.access(c, os.X_OK):
+            return os.path.realpath(c)
+    return None
+
+
+# (real path, inode, mtime, size) -> Future of the fingerprint, so each tool
+# only has its --version asked once per process
+_memo = {}
+_memo_lock = threading.Lock()
+
+def identity(tool, env):
+    ''' Return (real path, inode, mtime, size, args) for a ShellCommand,
+        or None if there is no such program in env's PATH.
+
+        This is cheap, and changes whenever fingerprint() might.
+    '''
+    if not tool.list:
+        return None
+    path = which(tool.list[0], env)
+    if path is None:
+        return None
+    st = os.stat(path)
+    return (path, st.st_ino, st.st_mtime, st.st_size, tuple(tool.list[1:]))
+
+def fingerprint(build, tool):
+    ''' Return a digest identifying the program behind a ShellCommand.
+
+        This notices if e.g. a distro upgrade replaces the binary behind
+        gcc, even though the command line stays the same.
+        If the persistent cache is enabled, the output of --version and
+        -dumpmachine is also remembered there, keyed by the file's identity.
+    '''
+    from ..jobs import Future
+    if not tool.list:
+        return cache_key('empty')
+    ident = identity(tool, build.env)
+    if ident is None:
+        return cache_key('missing', tool.list)
+    # probes ask from several threads at once; the first one for each
+    # tool asks it, and only the others for that tool have to wait
+    with _memo_lock:
+        future = _memo.get(ident)
+        mine = future is None
+        if mine:
+            future = _memo[ident] = Future()
+    if mine:
+        try:
+            future.set_result(_fingerprint(build, tool, ident))
+        except BaseException:
+            # let the next caller try again instead
+            with _memo_lock:
+                del _memo[ident]
+            future.set_error(sys.exc_info())
+    return future.result()
+
+def _fingerprint(build, tool, ident):
+    outputs = []
+    for arg in ['--version', '-dumpmachine']:
+        _, out = cached_exec(build, cache_key('fingerprint', ident, arg),
+                lambda: _ask(build, tool + [arg]))
+        outputs.append(out)
+    return cache_key(ident, outputs)
+
+def _ask(build, args):
+    # .c imports this module, so import it late
+    from .c import do_exec
+    # not every tool understands every question, but failing
+    # is a perfectly good answer and should be cached too
+    status, out = do_exec(build, args)
+    return 0, '%d\n%s' % (status, out)
@@ -20,119 +20,144 @@ from __future__ import print_function, division, absolute_import
 import os
 
 from ..classy import ClassyProject
+from ..core import uses
 from ..types import shell_word, filepath, quoted_string, maybe
 
 
+@uses()
 def package(build, PACKAGE):
     pass
 
+@uses()
 def package_name(build, NAME):
     pass
 
+@uses()
 def prefix(build, PREFIX):
     pass
 
+@uses(reads=['PREFIX'], writes=['EXEC_PREFIX', 'EPREFIX'])
 def exec_prefix(build, EPREFIX):
     if not EPREFIX:
         PREFIX = build.vars['PREFIX']
         build.vars['EXEC_PREFIX'] = PREFIX
     build.vars['EPREFIX'] = build.vars['EXEC_PREFIX']
 
+@uses(reads=['EPREFIX'])
 def bindir(build, DIR):
     if not DIR:
         EPREFIX = build.vars['EPREFIX']
         build.vars['BINDIR'] = os.path.join(EPREFIX, 'bin')
 
+@uses(reads=['EPREFIX'])
 def sbindir(build, DIR):
     if not DIR:
         EPREFIX = build.vars['EPREFIX']
         build.vars['SBINDIR'] = os.path.join(EPREFIX, 'sbin')
 
+@uses(reads=['EPREFIX'])
 def libexecdir(build, DIR):
     if not DIR:
         EPREFIX = build.vars['EPREFIX']
         build.vars['LIBEXECDIR'] = os.path.join(EPREFIX, 'libexec')
 
+@uses(reads=['PREFIX'])
 def sysconfdir(build, DIR):
     if not DIR:
         PREFIX = build.vars['PREFIX']
         build.vars['SYSCONFDIR'] = os.path.join(PREFIX, 'etc')
 
+@uses(reads=['PREFIX'])
 def sharedstatedir(build, DIR):
     if not DIR:
         PREFIX = build.vars['PREFIX']
         build.vars['SHAREDSTATEDIR'] = os.path.join(PREFIX, 'com')
 
+@uses(reads=['PREFIX'])
 def localstatedir(build, DIR):
     if not DIR:
         PREFIX = build.vars['PREFIX']
         build.vars['LOCALSTATEDIR'] = os.path.join(PREFIX, 'var')
 
+@uses(reads=['EPREFIX'])
 def libdir(build, DIR):
     if not DIR:
         EPREFIX = build.vars['EPREFIX']
         build.vars['LIBDIR'] = os.path.join(EPREFIX, 'lib')
 
+@uses(reads=['PREFIX'])
 def includedir(build, DIR):
     if not DIR:
         PREFIX = build.vars['PREFIX']
         build.vars['INCLUDEDIR'] = os.path.join(PREFIX, 'include')
 
+@uses()
 def oldincludedir(build, DIR):
     pass
 
+@uses(reads=['PREFIX'])
 def datarootdir(build, DIR):
     if not DIR:
         PREFIX = build.vars['PREFIX']
         build.vars['DATAROOTDIR'] = os.path.join(PREFIX, 'share')
 
+@uses(reads=['DATAROOTDIR'])
 def datadir(build, DIR):
     if not DIR:
         DATAROOTDIR = build.vars['DATAROOTDIR']
         build.vars['DATADIR'] = DATAROOTDIR
 
+@uses(reads=['DATADIR', 'PACKAGE'])
 def packagedatadir(build, DIR):
     if not DIR:
         DATADIR = build.vars['DATADIR']
         PACKAGE = build.vars['PACKAGE']
         build.vars['PACKAGEDATADIR'] = os.path.join(DATADIR, PACKAGE)
 
+@uses(reads=['DATAROOTDIR'])
 def infodir(build, DIR):
     if not DIR:
         DATAROOTDIR = build.vars['DATAROOTDIR']
         build.vars['INFODIR'] = os.path.join(DATAROOTDIR, 'info')
 
+@uses(reads=['DATAROOTDIR'])
 def localedir(build, DIR):
     if not DIR:
         DATAROOTDIR = build.vars['DATAROOTDIR']
         build.vars['LOCALEDIR'] = os.path.join(DATAROOTDIR, 'locale')
 
+@uses(reads=['DATAROOTDIR'])
 def mandir(build, DIR):
     if not DIR:
         DATAROOTDIR = build.vars['DATAROOTDIR']
         build.vars['MANDIR'] = os.path.join(DATAROOTDIR, 'man')
 
+@uses(reads=['DATAROOTDIR', 'PACKAGE'])
 def docdir(build, DIR):
     if not DIR:
         DATAROOTDIR = build.vars['DATAROOTDIR']
         PACKAGE = build.vars['PACKAGE']
         build.vars['DOCDIR'] = os.path.join(DATAROOTDIR, 'doc', PACKAGE)
 
+@uses(reads=['DOCDIR'])
 def htmldir(build, DIR):
     if not DIR:
         DOCDIR = build.vars['DOCDIR']
         build.vars['HTMLDIR'] = DOCDIR
 
+@uses(reads=['DOCDIR'])
 def dvidir(build, DIR):
     if not DIR:
         DOCDIR = build.vars['DOCDIR']
         build.vars['DVIDIR'] = DOCDIR
 
+@uses(reads=['DOCDIR'])
 def pdfdir(build, DIR):
     if not DIR:
         DOCDIR = build.vars['DOCDIR']
         build.vars['PDFDIR'] = DOCDIR
 
+@uses(reads=['DOCDIR'])
 def psdir(build, DIR):
     if not DIR:
         DOCDIR = build.vars['DOCDIR']
@@ -149,7 +174,8 @@ class Install(ClassyProject):
     # (Note: when bisecting, always force checkout attoconf!)
     def __init__(self, srcdir, package=None, package_name=None, **kwargs):
         super(Install, self).__init__(srcdir=srcdir, **kwargs)
-        self.set_package(package, package_name)
+        self.package = package
+        self.package_name = package_name
 
     def set_package(self, package, package_name):
         if package is not None:
@@ -159,6 +185,9 @@ class Install(ClassyProject):
         if package is not None:
             self._do_jiggle()
 
+    def _ready_to_jiggle_(self):
+        return self.package is not None
+
     def general(self):
         super(Install, self).general()
         self.add_option('--package', init=self.package,
@@ -18,8 +18,10 @@
 from __future__ import print_function, division, absolute_import
 
 from ..classy import ClassyProject
-from ..types import ShellList
+from ..core import uses
+from ..types import ShellCommand
 
+@uses()
 def flex(build, FLEX):
     # TODO actually test it
     pass
@@ -29,6 +31,6 @@ class Flex(ClassyProject):
     def vars(self):
         super(Flex, self).vars()
         self.add_option('FLEX', init=['flex'],
-                type=ShellList, check=flex,
+                type=ShellCommand, check=flex,
                 help='Lexical analyzer command',
                 hidden=False)
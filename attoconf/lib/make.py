@@ -28,50 +28,91 @@ def validate(s):
     return s == s.strip() and not frozenset(s) & blacklist
 
 
+def write_vars(build, out):
+    for var in build.project.order:
+        if var is None:
+            out.write('\n')
+            continue
+        val = build.vars[var]
+        out.write('%s = %s\n' % (var, val))
+
+
 class MakeHook(object):
-    __slots__ = ('infile', 'outfile')
-    def __init__(self, infile, outfile):
+    __slots__ = ('infile', 'outfile', 'config')
+    # see Build.write_snapshot
+    regenerate = True
+    def __init__(self, infile, outfile, config=None):
         self.infile = infile
         self.outfile = outfile
+        self.config = config
 
     def __call__(self, build):
+        from .. import trace
+        from ..files import OutputFile
         if self.outfile is None:
             # if there are multiple backends
             print('Skipping generation of a makefile')
             return
-        with open(os.path.join(build.builddir, self.outfile), 'w') as out:
+        build.vars['SRC_DIR'] = build.relative_source()
+        if self.config is not None:
+            self.include(build)
+            return
+        outfile = os.path.join(build.builddir, self.outfile)
+        build.files.add(outfile)
+        with trace.span(self.outfile, 'render'), OutputFile(outfile) as out:
             print('Generating a makefile ...')
             out.write('# This part was generated by %s\n' % full_version)
-            build.vars['SRC_DIR'] = build.relative_source()
-            for var in build.project.order:
-                if var is None:
-                    out.write('\n')
-                    continue
-                val = build.vars[var]
-                out.write('%s = %s\n' % (var, val))
+            write_vars(build, out)
             if self.infile is not None:
                 out.write('# The rest was copied from %s\n' % self.infile)
                 infile = os.path.join(build.project.srcdir, self.infile)
+                build.files.add(infile)
                 with open(infile) as in_:
                     for line in in_:
                         assert line.endswith('\n')
                         out.write(line)
 
+    def include(self, build):
+        ''' Write just the variables, and a makefile that includes them.
+
+            Since the source makefile is included rather than copied,
+            editing it doesn't need a reconfigure.
+        '''
+        from .. import trace
+        from ..files import OutputFile
+        config = os.path.join(build.builddir, self.config)
+        outfile = os.path.join(build.builddir, self.outfile)
+        build.files.update([config, outfile])
+        with trace.span(self.config, 'render'), OutputFile(config) as out:
+            print('Generating %s ...' % self.config)
+            out.write('# This file was generated by %s\n' % full_version)
+            write_vars(build, out)
+        with trace.span(self.outfile, 'render'), OutputFile(outfile) as out:
+            print('Generating a makefile ...')
+            out.write('# This file was generated by %s\n' % full_version)
+            out.write('include %s\n' % self.config)
+            if self.infile is not None:
+                out.write('include $(SRC_DIR)/%s\n' % self.infile)
+
 
 class Make(ClassyProject):
     ''' Post hook to generate a Makefile from Makefile.in
     '''
     __slots__ = ()
-    _merge_slots_ = ('make_in', 'make_out')
+    _merge_slots_ = ('make_in', 'make_out', 'make_config')
 
     # compatibility with attoconf < 0.7
     def __init__(self, srcdir,
             make_infile='Makefile.in',
             make_outfile='Makefile',
+            make_config=None,
             **kwargs):
         super(Make, self).__init__(srcdir=srcdir, **kwargs)
         self.set_make_infile(make_infile)
         self.set_make_outfile(make_outfile) # relative to build dir
+        # if set (e.g. to 'config.mk'), only the variables are written
+        # there, and the makefile includes it and make_infile by path
+        self.make_config = make_config
 
     def set_make_infile(self, ipath):
         self.make_in = ipath
@@ -84,4 +125,5 @@ class Make(ClassyProject):
         if 'SRC_DIR' in self.order:
             sys.exit('ERROR: Incompatible generator hooks!')
         self.order.insert(0, 'SRC_DIR')
-        self.checks.append(MakeHook(self.make_in, self.make_out))
+        self.checks.append(MakeHook(self.make_in, self.make_out,
+                self.make_config))
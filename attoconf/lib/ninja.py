@@ -0,0 +1,93 @@
+#   Copyright 2013-2014 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+
+from ..classy import ClassyProject
+from ..version import full_version
+
+
+def escape(s):
+    ''' Quote a value for the right-hand side of a ninja variable.
+
+        Ninja has no way to put a newline in one ($ and a newline
+        is a line continuation, which becomes nothing), so that's
+        an error.
+    '''
+    if '\n' in s:
+        raise ValueError('Newline in ninja variable: %r' % s)
+    return s.replace('$', '$$')
+
+
+class NinjaHook(object):
+    __slots__ = ('infile', 'outfile')
+    # see Build.write_snapshot
+    regenerate = True
+    def __init__(self, infile, outfile):
+        self.infile = infile
+        self.outfile = outfile
+
+    def __call__(self, build):
+        from .. import trace
+        from ..files import OutputFile
+        if self.outfile is None:
+            print('Skipping generation of a build.ninja')
+            return
+        outfile = os.path.join(build.builddir, self.outfile)
+        build.files.add(outfile)
+        with trace.span(self.outfile, 'render'), OutputFile(outfile) as out:
+            print('Generating a build.ninja ...')
+            out.write('# This file was generated by %s\n' % full_version)
+            # Make etc. only fill this in when their own hook runs
+            build.vars['SRC_DIR'] = build.relative_source()
+            order = build.project.order
+            if 'SRC_DIR' not in order:
+                out.write('SRC_DIR = %s\n' % escape(build.vars['SRC_DIR']))
+            for var in order:
+                if var is None:
+                    out.write('\n')
+                    continue
+                val = build.vars[var]
+                out.write('%s = %s\n' % (var, escape(str(val))))
+            if self.infile is not None:
+                # ninja expands variables in include paths
+                out.write('include $SRC_DIR/%s\n' % self.infile)
+
+
+class Ninja(ClassyProject):
+    ''' Post hook to generate a build.ninja that includes build.ninja.in
+
+        This can be used alongside Make (or instead of it).
+    '''
+    __slots__ = ()
+    _merge_slots_ = ('ninja_in', 'ninja_out')
+
+    def __init__(self, srcdir,
+            ninja_infile='build.ninja.in',
+            ninja_outfile='build.ninja',
+            **kwargs):
+        super(Ninja, self).__init__(srcdir=srcdir, **kwargs)
+        self.ninja_in = ninja_infile
+        self.ninja_out = ninja_outfile # relative to build dir
+
+    def post(self):
+        super(Ninja, self).post()
+        # unlike the other generators, don't claim SRC_DIR in the order,
+        # so that this doesn't conflict with them
+        self.checks.append(NinjaHook(self.ninja_in, self.ninja_out))
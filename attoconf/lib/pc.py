@@ -0,0 +1,312 @@
+#   Copyright 2013-2014 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Read .pc files directly, instead of running pkg-config.
+
+    This follows pkgconf (which is what pkg-config is nowadays):
+    each package's flags come before those of the packages it requires,
+    -I and -L keep their first occurrence, other flags their last,
+    and system directories are left out at the end.
+
+    Anything this doesn't understand raises PcError, and the caller
+    is expected to ask the real tool instead.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import re
+import threading
+
+from ..types import shell_split
+
+
+class PcError(Exception):
+    pass
+
+
+# (path) -> (mtime, size, PcFile)
+_parsed = {}
+_parsed_lock = threading.Lock()
+
+_line_re = re.compile(r'([A-Za-z0-9_.]+)\s*([:=])\s*(.*)$')
+_var_re = re.compile(r'\$\$|\$\{([^}]*)\}|\$')
+_fields = frozenset(['Name', 'Description', 'Version', 'URL',
+        'Requires', 'Requires.private', 'Conflicts', 'Provides',
+        'Cflags', 'CFlags', 'Cflags.private', 'Libs', 'Libs.private'])
+_ops = frozenset(['<', '<=', '=', '!=', '>=', '>'])
+# flags whose meaning depends on the next argument, or on their position,
+# which pkgconf groups or keeps in place in ways not worth imitating
+_special = frozenset(['-I', '-L', '-framework', '-isystem', '-idirafter',
+        '-include', '-imacros', '-iquote', '-Xlinker', '--param',
+        '-Wl,--start-group', '-Wl,--end-group',
+        '-Wl,--whole-archive', '-Wl,--no-whole-archive'])
+
+
+class PcFile(object):
+    ''' The fields of one .pc file, with variables already expanded.
+    '''
+    __slots__ = ('name', 'path', 'fields')
+    def __init__(self, name, path, fields):
+        self.name = name
+        self.path = path
+        self.fields = fields
+
+    def get(self, field):
+        if field == 'Cflags' and 'CFlags' in self.fields:
+            return self.fields['CFlags']
+        return self.fields.get(field, '')
+
+
+def _expand(value, vars, path):
+    def sub(m):
+        if m.group(0) == '$$':
+            return '$'
+        name = m.group(1)
+        if name is None or name not in vars:
+            raise PcError('%s: undefined variable in %r' % (path, value))
+        return vars[name]
+    return _var_re.sub(sub, value)
+
+def _lines(text):
+    line = []
+    for raw in text.split('\n'):
+        if raw.endswith('\\'):
+            line.append(raw[:-1])
+            continue
+        line.append(raw)
+        yield ''.join(line)
+        line = []
+
+def parse_pc(path):
+    ''' Parse a .pc file, reusing the last result if it hasn't changed.
+    '''
+    st = os.stat(path)
+    with _parsed_lock:
+        old = _parsed.get(path)
+    if old is not None and old[:2] == (st.st_mtime, st.st_size):
+        return old[2]
+    with open(path) as f:
+        text = f.read()
+    vars = {
+        'pcfiledir': os.path.dirname(path),
+        'pc_sysrootdir': '/',
+    }
+    fields = {}
+    for line in _lines(text):
+        # unlike everything else, \# is not a comment
+        line = re.sub(r'(?<!\\)#.*', '', line).replace('\\#', '#').strip()
+        if not line:
+            continue
+        m = _line_re.match(line)
+        if m is None:
+            raise PcError('%s: cannot parse %r' % (path, line))
+        key, op, value = m.groups()
+        value = _expand(value.strip(), vars, path)
+        if op == '=':
+            vars[key] = value
+        elif key in _fields:
+            fields[key] = value
+    name = os.path.basename(path)[:-len('.pc')]
+    pc = PcFile(name, path, fields)
+    with _parsed_lock:
+        _parsed[path] = (st.st_mtime, st.st_size, pc)
+    return pc
+
+
+def _vercmp_segments(v):
+    return re.findall(r'~|[0-9]+|[A-Za-z]+', v)
+
+def compare_versions(a, b):
+    ''' rpmvercmp, which is what pkgconf uses: -1, 0 or 1.
+    '''
+    if a == b:
+        return 0
+    sa = _vercmp_segments(a)
+    sb = _vercmp_segments(b)
+    while sa or sb:
+        x = sa.pop(0) if sa else None
+        y = sb.pop(0) if sb else None
+        if x == '~' or y == '~':
+            if x != '~':
+                return 1
+            if y != '~':
+                return -1
+            continue
+        if x is None:
+            return -1
+        if y is None:
+            return 1
+        if x.isdigit() != y.isdigit():
+            # numbers are newer than letters
+            return 1 if x.isdigit() else -1
+        if x.isdigit():
+            x = int(x)
+            y = int(y)
+        if x != y:
+            return 1 if x > y else -1
+    return 0
+
+def _satisfied(version, op, want):
+    c = compare_versions(version, want)
+    return {
+        '<': c < 0,
+        '<=': c <= 0,
+        '=': c == 0,
+        '!=': c != 0,
+        '>=': c >= 0,
+        '>': c > 0,
+    }[op]
+
+def parse_requires(value):
+    ''' Split a Requires field into [(name, op, version)].
+    '''
+    words = value.replace(',', ' ').split()
+    out = []
+    i = 0
+    while i < len(words):
+        name = words[i]
+        if name in _ops:
+            raise PcError('bad requirement: %r' % value)
+        i += 1
+        if i < len(words) and words[i] in _ops:
+            if i + 1 >= len(words):
+                raise PcError('bad requirement: %r' % value)
+            out.append((name, words[i], words[i + 1]))
+            i += 2
+        else:
+            out.append((name, None, None))
+    return out
+
+
+def _frag_type(arg):
+    if len(arg) > 1 and arg.startswith('-'):
+        return arg[1]
+    return ''
+
+def _add_fragment(frags, arg):
+    ''' Add one flag to frags, dropping duplicates the way pkgconf does.
+    '''
+    if arg in _special or arg.startswith(tuple(_special - {'-I', '-L'})):
+        raise PcError('not handled natively: %s' % arg)
+    t = _frag_type(arg)
+    if t in ('I', 'L'):
+        if arg not in frags:
+            frags.append(arg)
+        return
+    for i in xrange(len(frags) - 1, -1, -1):
+        if frags[i] == arg:
+            parent = _frag_type(frags[i - 1]) if i else None
+            if parent is None or parent in ('l', 'L', 'I') or not t or parent == t:
+                del frags[i]
+            break
+    frags.append(arg)
+
+
+class Resolver(object):
+    ''' Answers pkg-config questions for one search path.
+    '''
+    __slots__ = ('dirs', 'system_includedirs', 'system_libdirs')
+    def __init__(self, dirs, system_includedirs, system_libdirs):
+        self.dirs = dirs
+        self.system_includedirs = system_includedirs
+        self.system_libdirs = system_libdirs
+
+    def find(self, name):
+        for d in self.dirs:
+            if os.path.exists(os.path.join(d, name + '-uninstalled.pc')):
+                raise PcError('uninstalled package: %s' % name)
+            path = os.path.join(d, name + '.pc')
+            if os.path.exists(path):
+                return parse_pc(path)
+        raise PcError('package not found: %s' % name)
+
+    def walk(self, names):
+        ''' The packages and everything they require, flattened.
+
+            Same order as pkgconf: every package comes before all of
+            the packages it requires, which is what -l order needs.
+        '''
+        out = []
+        seen = set()
+        def visit(deps):
+            for d in reversed(deps):
+                if d.name not in seen:
+                    seen.add(d.name)
+                    visit(self._requires(d, ['Requires']))
+                    out.append(d)
+        visit([self.find(name) for name in names])
+        out.reverse()
+        return out
+
+    def preorder(self, names):
+        ''' The packages and everything they require, including privately.
+
+            pkgconf doesn't flatten for Cflags, just visits each package
+            once, depth-first, with Requires.private before Requires.
+        '''
+        out = []
+        seen = set()
+        def visit(deps):
+            for d in deps:
+                if d.name not in seen:
+                    seen.add(d.name)
+                    out.append(d)
+                    visit(self._requires(d, ['Requires.private', 'Requires']))
+        visit([self.find(name) for name in names])
+        return out
+
+    def _requires(self, pc, fields):
+        if pc.get('Conflicts'):
+            raise PcError('%s has conflicts' % pc.name)
+        deps = []
+        for field in fields:
+            for dep, op, want in parse_requires(pc.get(field)):
+                d = self.find(dep)
+                if op is not None and not _satisfied(d.get('Version'), op, want):
+                    raise PcError('%s requires %s %s %s' % (pc.name, dep, op, want))
+                deps.append(d)
+        return deps
+
+    def _flags(self, packages, field):
+        frags = []
+        for pc in packages:
+            for arg in shell_split(pc.get(field)):
+                _add_fragment(frags, arg)
+        return frags
+
+    def modversion(self, name):
+        return self.find(name).get('Version')
+
+    def cflags(self, names):
+        ''' Return (-I flags, other flags) for a list of packages.
+        '''
+        frags = self._flags(self.preorder(names), 'Cflags')
+        system = ['-I' + d for d in self.system_includedirs]
+        return ([f for f in frags if f.startswith('-I') and f not in system],
+                [f for f in frags if not f.startswith('-I')])
+
+    def libs(self, names):
+        ''' Return (-L flags, -l and other flags) for a list of packages.
+
+            The -l and other flags stay in the same order, since
+            e.g. -Wl,--as-needed only applies to the libraries after it.
+        '''
+        frags = self._flags(self.walk(names), 'Libs')
+        system = ['-L' + d for d in self.system_libdirs]
+        return ([f for f in frags if f.startswith('-L') and f not in system],
+                [f for f in frags if not f.startswith('-L')])
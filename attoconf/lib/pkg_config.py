@@ -19,36 +19,189 @@ from __future__ import print_function, division, absolute_import
 
 import os
 import sys
+import threading
 
 from ..classy import ClassyProject
-from ..types import enum, ShellList
+from ..core import as_var, uses
+from ..types import enum, shell_split, ShellCommand
 
 from .c import do_exec, TestError, C, Cxx
+from .cache import cache_key, cached_exec, get_cache
+from .fingerprint import fingerprint
+from .pc import PcError, Resolver
 
 
 yesno = enum('yes', 'no')
 
+# everything in the environment that changes what pkg-config says
+pkg_config_env = (
+        'PKG_CONFIG_PATH',
+        'PKG_CONFIG_LIBDIR',
+        'PKG_CONFIG_SYSROOT_DIR',
+        'PKG_CONFIG_ALLOW_SYSTEM_CFLAGS',
+        'PKG_CONFIG_ALLOW_SYSTEM_LIBS',
+        'PKG_CONFIG_SYSTEM_INCLUDE_PATH',
+        'PKG_CONFIG_SYSTEM_LIBRARY_PATH',
+        'CPATH',
+        'C_INCLUDE_PATH',
+        'CPLUS_INCLUDE_PATH',
+)
+
+# (PKG_CONFIG, env) -> Resolver
+_resolvers = {}
+_resolvers_lock = threading.Lock()
+
+def pkg_config_key(build, args):
+    PKG_CONFIG = build.vars['PKG_CONFIG']
+    env = [build.env.get(k) for k in pkg_config_env]
+    return cache_key('pkg-config', fingerprint(build, PKG_CONFIG),
+            PKG_CONFIG.list, env, args)
+
+def pkg_config_dirs(build):
+    ''' The directories that pkg-config would search for .pc files.
+    '''
+    PKG_CONFIG = build.vars['PKG_CONFIG']
+    path = build.env.get('PKG_CONFIG_PATH', '')
+    libdir = build.env.get('PKG_CONFIG_LIBDIR')
+    if libdir is None:
+        args = ['--variable', 'pc_path', 'pkg-config']
+        status, libdir = cached_exec(build, pkg_config_key(build, args),
+                lambda: do_exec(build, PKG_CONFIG + args))
+        if status:
+            raise TestError(libdir)
+        libdir = libdir.strip()
+    return [d for d in (path + ':' + libdir).split(':') if d]
+
 def run_pkg_config(build, *args):
     PKG_CONFIG = build.vars['PKG_CONFIG']
-    status, output = do_exec(build, PKG_CONFIG + list(args))
+    args = list(args)
+    run = lambda: do_exec(build, PKG_CONFIG + args)
+    if get_cache(build) is None:
+        status, output = run()
+    else:
+        # .pc files are replaced, not edited, so the directory mtimes
+        # are enough to notice installed, removed or upgraded packages
+        stamps = []
+        for d in pkg_config_dirs(build):
+            try:
+                stamps.append((d, os.stat(d).st_mtime))
+            except OSError:
+                stamps.append((d, None))
+        key = cache_key(pkg_config_key(build, args), stamps)
+        status, output = cached_exec(build, key, run)
     if status:
         raise TestError(output)
     return output.strip()
 
+def _system_dirs(build, env, variable, default):
+    if env in build.env:
+        value = build.env[env]
+    else:
+        PKG_CONFIG = build.vars['PKG_CONFIG']
+        args = ['--variable', variable, 'pkg-config']
+        status, value = cached_exec(build, pkg_config_key(build, args),
+                lambda: do_exec(build, PKG_CONFIG + args))
+        # only pkgconf knows these
+        value = value.strip()
+        if status or not value:
+            value = default
+    return [d for d in value.split(':') if d]
+
+def native_resolver(build):
+    ''' Return a Resolver that answers the same as PKG_CONFIG, or None.
+
+        Sysroots are left to the real tool, as is anything that isn't
+        plainly pkg-config or pkgconf (say, a cross wrapper script).
+    '''
+    if build.vars['NATIVE_PKG_CONFIG'] != 'yes':
+        return None
+    if build.env.get('PKG_CONFIG_SYSROOT_DIR'):
+        return None
+    PKG_CONFIG = build.vars['PKG_CONFIG']
+    if len(PKG_CONFIG.list) != 1:
+        return None
+    if os.path.basename(PKG_CONFIG.list[0]) not in ('pkg-config', 'pkgconf'):
+        return None
+    key = (PKG_CONFIG.list[0],) + tuple(build.env.get(k) for k in pkg_config_env)
+    with _resolvers_lock:
+        resolver = _resolvers.get(key)
+    if resolver is not None:
+        return resolver
+    if build.env.get('PKG_CONFIG_ALLOW_SYSTEM_CFLAGS'):
+        includedirs = []
+    else:
+        includedirs = _system_dirs(build, 'PKG_CONFIG_SYSTEM_INCLUDE_PATH',
+                'pc_system_includedirs', '/usr/include')
+        for env in ('CPATH', 'C_INCLUDE_PATH', 'CPLUS_INCLUDE_PATH'):
+            includedirs += [d for d in build.env.get(env, '').split(':') if d]
+    if build.env.get('PKG_CONFIG_ALLOW_SYSTEM_LIBS'):
+        libdirs = []
+    else:
+        libdirs = _system_dirs(build, 'PKG_CONFIG_SYSTEM_LIBRARY_PATH',
+                'pc_system_libdirs', '/usr/lib:/lib')
+    resolver = Resolver(pkg_config_dirs(build), includedirs, libdirs)
+    with _resolvers_lock:
+        return _resolvers.setdefault(key, resolver)
+
+def package_flags(build, packages):
+    ''' Return ([modversion], cppflags, cflags, ldflags, libs) for a list
+        of packages, merged the way a single pkg-config call merges them.
+
+        The .pc files are read directly when possible, and PKG_CONFIG
+        is only run for what that can't handle: a few calls for all the
+        packages together, at the same time.  It is asked for each kind
+        of flag separately, instead of sorting them out by prefix, since
+        some take an argument (-isystem dir, -framework X).
+    '''
+    resolver = native_resolver(build)
+    if resolver is not None:
+        try:
+            modversions = [resolver.modversion(p) for p in packages]
+            cppflags, cflags = resolver.cflags(packages)
+            ldflags, libs = resolver.libs(packages)
+            return modversions, cppflags, cflags, ldflags, libs
+        except PcError:
+            pass
+    queries = [
+            ['--modversion'],
+            ['--cflags-only-I'],
+            ['--cflags-only-other'],
+            ['--libs-only-L'],
+            # together, so they stay in order
+            ['--libs-only-l', '--libs-only-other'],
+    ]
+    futures = [build.jobs.submit(run_pkg_config, build, *(query + packages))
+            for query in queries]
+    outputs = [f.result() for f in futures]
+    modversions = outputs[0].split('\n')
+    if len(modversions) != len(packages):
+        raise TestError('pkg-config --modversion: expected %d lines, got %r'
+                % (len(packages), modversions))
+    return tuple([modversions] + [shell_split(out) for out in outputs[1:]])
+
+@uses()
 def check_pkg_config(build, PKG_CONFIG):
     version = run_pkg_config(build, '--version')
     print('Found pkg-config: %s' % version)
 
-def package_check(build, package, **var):
-    assert len(var) == 1
-    _package, enabled = var.popitem()
-    enabled = enabled == 'yes'
-    modversion = run_pkg_config(build, '--modversion', package)
-    print("Found dependency '%s': %s" % (package, modversion))
-    cppflags = run_pkg_config(build, '--cflags-only-I', package)
-    cflags = run_pkg_config(build, '--cflags-only-other', package)
-    ldflags = run_pkg_config(build, '--libs-only-L', '--libs-only-other', package)
-    libs = run_pkg_config(build, '--libs-only-l', package)
+@uses()
+def package_check(build, **var):
+    ''' The check hook for --with-PACKAGE.
+
+        Nothing happens here; PackagesCheck looks at all of them at once.
+    '''
+
+@uses(reads=['PKG_CONFIG', 'NATIVE_PKG_CONFIG'],
+        writes=['CPPFLAGS', 'CFLAGS', 'CXXFLAGS', 'LDFLAGS', 'LIBS'])
+def packages_check(build, packages):
+    enabled = [p for p in packages if build.vars[as_var('--with-' + p)] == 'yes']
+    if not enabled:
+        return
+    modversions, cppflags, cflags, ldflags, libs = package_flags(build, enabled)
+    # .pc files are replaced, not edited, see run_pkg_config()
+    build.files.update(pkg_config_dirs(build))
+    for package, modversion in zip(enabled, modversions):
+        print("Found dependency '%s': %s" % (package, modversion))
 
     build.vars['CPPFLAGS'] += cppflags
     if 'CFLAGS' in build.vars:
@@ -58,6 +211,22 @@ def package_check(build, package, **var):
     build.vars['LDFLAGS'] += ldflags
     build.vars['LIBS'] += libs
 
+class PackagesCheck(object):
+    ''' Add the flags for every --with-PACKAGE=yes, in the order given.
+    '''
+    __slots__ = ('packages', 'reads')
+    writes = packages_check.writes
+    env = pkg_config_env
+
+    def __init__(self, packages):
+        self.packages = packages
+        self.reads = packages_check.reads | frozenset(
+                as_var('--with-' + p) for p in packages)
+
+    def __call__(self, build):
+        packages_check(build, self.packages)
+
+
 class PkgConfig(ClassyProject):
     ''' Fill CFLAGS etc by pkg-config for dependencies.
     '''
@@ -73,8 +242,11 @@ class PkgConfig(ClassyProject):
     def vars(self):
         super(PkgConfig, self).vars()
         self.add_option('PKG_CONFIG', init=['pkg-config'],
-                type=ShellList, check=check_pkg_config,
+                type=ShellCommand, check=check_pkg_config,
                 help='Tool to find dependencies', hidden=False)
+        self.add_option('--native-pkg-config', init='yes',
+                type=yesno, check=None,
+                help='Read .pc files without running PKG_CONFIG', hidden=True)
 
     def packages(self):
         super(PkgConfig, self).packages()
@@ -82,12 +254,14 @@ class PkgConfig(ClassyProject):
             self._pkg_config_add_package(package, True)
         for package in self.optional_packages:
             self._pkg_config_add_package(package, False)
+        self.checks.append(PackagesCheck(
+                list(self.required_packages) + list(self.optional_packages)))
 
     def _pkg_config_add_package(self, package, hidden):
         positive = '--with-' + package
         negative = '--without-' + package
         #check = package_required_check if hidden else package_optional_check
-        check = lambda build, **kwargs: package_check(build, package, **kwargs)
+        check = package_check
         level = 'required' if hidden else 'optional'
         help = "Build with %s dependency '%s'" % (level, package)
         self.add_option(positive, type=yesno, hidden=hidden, init='yes', check=check, help=help)
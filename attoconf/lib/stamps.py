@@ -0,0 +1,129 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' One generated header per var (or group of vars), like the kernel's
+    include/config/, so that objects depend on just the options they use.
+
+    A header is only rewritten when its value changes (see OutputFile),
+    so with -MMD (or ninja's depfiles) changing --prefix only rebuilds
+    the objects that include config/prefix.h, unlike CONFIG_HASH.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+
+from ..classy import ClassyProject
+
+
+def c_string(s):
+    ''' Quote a str as a C string literal.
+    '''
+    out = ['"']
+    for c in s:
+        if c in '"\\':
+            out.append('\\' + c)
+        elif ' ' <= c <= '~':
+            out.append(c)
+        else:
+            # always 3 digits, so the next char can't be taken for one
+            out.append('\\%03o' % ord(c))
+    out.append('"')
+    return ''.join(out)
+
+
+def stamp_text(name, vars, build):
+    ''' The contents of the header for a var or group.
+    '''
+    guard = 'ATTOCONF_CONFIG_%s_H' % name.upper()
+    lines = [
+        '/* Generated by attoconf; changes only when %s does. */'
+            % ', '.join(vars),
+        '#ifndef %s' % guard,
+        '#define %s' % guard,
+    ]
+    for var in vars:
+        lines.append('#define %s %s' % (var, c_string(str(build.vars[var]))))
+    lines.append('#endif')
+    lines.append('')
+    return '\n'.join(lines)
+
+
+class StampsHook(object):
+    __slots__ = ('dir', 'vars', 'groups')
+    # see Build.write_snapshot
+    regenerate = True
+    def __init__(self, dir, vars, groups):
+        self.dir = dir
+        self.vars = vars
+        self.groups = groups
+
+    def stamps(self, build):
+        ''' The (name, vars) of each header, in order.
+        '''
+        vars = self.vars
+        if vars is None:
+            grouped = set()
+            for name, group in self.groups:
+                grouped.update(group)
+            # SRC_DIR is only set by the other output hooks
+            vars = [v for v in build.project.order
+                    if v is not None and v != 'SRC_DIR' and v not in grouped]
+        return [(v, [v]) for v in vars] + list(self.groups)
+
+    def __call__(self, build):
+        from .. import trace
+        from ..files import OutputFile
+        dir = os.path.join(build.builddir, self.dir)
+        if not os.path.isdir(dir):
+            os.makedirs(dir)
+        stamps = self.stamps(build)
+        print('Generating %d headers in %s/ ...' % (len(stamps), self.dir))
+        with trace.span(self.dir, 'render'):
+            for name, vars in stamps:
+                path = os.path.join(dir, name.lower() + '.h')
+                build.files.add(path)
+                with OutputFile(path) as out:
+                    out.write(stamp_text(name, vars, build))
+
+
+class Stamps(ClassyProject):
+    ''' Post hook to write a header per var, see the module docstring.
+
+        By default every var in the order gets a header, except those
+        in a group; groups are (name, [vars]) pairs, and get one header
+        for all of their vars, e.g. ('dirs', ['BINDIR', 'DATADIR']).
+    '''
+    __slots__ = ()
+    _merge_slots_ = ('stamp_dir', 'stamp_vars', 'stamp_groups')
+
+    def __init__(self, stamp_dir='config', stamp_vars=None, stamp_groups=(),
+            **kwargs):
+        super(Stamps, self).__init__(**kwargs)
+        self.stamp_dir = stamp_dir # relative to build dir
+        self.stamp_vars = stamp_vars
+        self.stamp_groups = [(name, list(vars)) for name, vars in stamp_groups]
+
+    def post(self):
+        super(Stamps, self).post()
+        names = [name.lower() for name in self.stamp_vars or ()]
+        names += [name.lower() for name, vars in self.stamp_groups]
+        if len(set(names)) != len(names):
+            sys.exit('ERROR: Duplicate stamp names!')
+        self.checks.append(StampsHook(self.stamp_dir, self.stamp_vars,
+                self.stamp_groups))
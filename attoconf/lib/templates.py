@@ -17,43 +17,140 @@
 
 from __future__ import print_function, division, absolute_import
 
+from collections import OrderedDict
 import os
 import sys
+import threading
 
 from ..classy import ClassyProject
 
 
+# (digest of template, names) -> compiled template, least recently used first
+_compiled = OrderedDict()
+_compiled_lock = threading.Lock()
+# hooks may run in threads, and a long-lived process may see many templates
+compiled_max = 32
+# templates bigger than this are streamed from an mmap instead of
+# being read (and compiled) in one piece, so memory use stays bounded
+stream_threshold = 1 << 20
+_chunk = 1 << 16
+
+
+def scan(text, names):
+    ''' Find every @VAR@ in text (a str or an mmap) whose VAR is in names.
+
+        Yields (start, end, var) for each literal span and the
+        substitution that follows it; the last var is None.
+
+        This is a single pass: replacements are never rescanned, and
+        an @ that doesn't start a known @VAR@ may still end one.
+    '''
+    longest = max(len(n) for n in names) if names else 0
+    start = 0
+    i = text.find('@')
+    while i != -1:
+        j = text.find('@', i + 1)
+        if j == -1:
+            break
+        # don't copy what can't be a name (this matters for an mmap)
+        var = text[i + 1:j] if j - i - 1 <= longest else None
+        if var in names:
+            yield start, i, var
+            start = j + 1
+            i = text.find('@', start)
+        else:
+            i = j
+    yield start, len(text), None
+
+
+def compile_template(text, names):
+    ''' Split text into [literal, var, literal, var, ..., literal].
+
+        The result is cached by content, since several outputs
+        (and repeated configures) often use the same template;
+        only the compiled_max most recently used are kept.
+    '''
+    from hashlib import sha1
+    key = sha1(text).digest(), names
+    with _compiled_lock:
+        compiled = _compiled.pop(key, None)
+        if compiled is not None:
+            _compiled[key] = compiled
+            return compiled
+    compiled = []
+    for start, end, var in scan(text, names):
+        compiled.append(text[start:end])
+        if var is not None:
+            compiled.append(var)
+    with _compiled_lock:
+        _compiled[key] = compiled
+        while len(_compiled) > compiled_max:
+            _compiled.popitem(last=False)
+    return compiled
+
+
+def render_stream(infile, out, names, lookup):
+    ''' Copy infile to out, substituting lookup(var) for each @VAR@.
+
+        Unlike compile_template, this never holds more than a chunk
+        of the template in memory at once.
+    '''
+    import mmap
+    with open(infile, 'rb') as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        for start, end, var in scan(mm, names):
+            for i in xrange(start, end, _chunk):
+                out.write(mm[i:min(i + _chunk, end)])
+            if var is not None:
+                out.write(lookup(var))
+    finally:
+        mm.close()
+
+
 class TemplateHook(object):
     __slots__ = ('outfiles')
+    # see Build.write_snapshot
+    regenerate = True
     def __init__(self, outfiles):
         self.outfiles = outfiles
 
     def __call__(self, build):
+        from .. import trace
+        from ..files import OutputFile
         build.vars['SRC_DIR'] = build.relative_source()
-        unseen = set(build.project.order)
-        if None in unseen:
-            unseen.remove(None)
+        names = frozenset(build.project.order) - {None}
+        unseen = set(names)
+        # only stringify what some template actually uses
+        values = {}
+        def lookup(var):
+            val = values.get(var)
+            if val is None:
+                val = values[var] = str(build.vars[var])
+                unseen.discard(var)
+            return val
         for outfile in self.outfiles:
             infile = outfile + '.in'
             print('Generating %s from %s' % (outfile, infile))
             # by replacing all instances of @VARIABLE@ with the value
 
-            slurpee = open(os.path.join(build.project.srcdir, infile)).read()
-            for var in build.project.order:
-                if var is None:
-                    continue
-                val = build.vars[var]
-                key = '@' + var + '@'
-                if key not in slurpee:
-                    continue
-                if var in unseen:
-                    unseen.remove(var)
-                slurpee = slurpee.replace(key, str(val))
-            with open(os.path.join(build.builddir, outfile), 'w') as out:
-                out.write(slurpee)
+            with trace.span(outfile, 'render'):
+                inpath = os.path.join(build.project.srcdir, infile)
+                outpath = os.path.join(build.builddir, outfile)
+                build.files.update([inpath, outpath])
+                if os.path.getsize(inpath) > stream_threshold:
+                    with OutputFile(outpath) as f:
+                        render_stream(inpath, f, names, lookup)
+                else:
+                    with open(inpath) as in_:
+                        out = compile_template(in_.read(), names)[:]
+                    for i in xrange(1, len(out), 2):
+                        out[i] = lookup(out[i])
+                    with OutputFile(outpath) as f:
+                        f.write(''.join(out))
         if unseen:
             print('WARNING: variables not used:')
-            print('  ' + '\n  '.join(unseen))
+            print('  ' + '\n  '.join(sorted(unseen)))
         # lone @s may legitimately appear in the makefile.
         # paired @s, which would be a forgotten subst, will be obvious.
 
@@ -18,8 +18,10 @@
 from __future__ import print_function, division, absolute_import
 
 from ..classy import ClassyProject
-from ..types import ShellList
+from ..core import uses
+from ..types import ShellCommand
 
+@uses()
 def bison(build, BISON):
     # TODO actually test it
     pass
@@ -29,6 +31,6 @@ class Bison(ClassyProject):
     def vars(self):
         super(Bison, self).vars()
         self.add_option('BISON', init=['bison'],
-                type=ShellList, check=bison,
+                type=ShellCommand, check=bison,
                 help='Lexical analyzer command',
                 hidden=False)
@@ -0,0 +1,97 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+import threading
+import time
+
+from .version import full_version
+
+
+class ConfigLog(object):
+    ''' config.log, plus config.log.jsonl with the same in machine form.
+
+        Every command run on behalf of a check is recorded,
+        along with how long it took and (some of) what it said.
+    '''
+    __slots__ = ('text', 'json', 'max_output', '_lock')
+    def __init__(self, builddir, max_output=4096):
+        self.text = open(os.path.join(builddir, 'config.log'), 'w')
+        self.json = open(os.path.join(builddir, 'config.log.jsonl'), 'w')
+        self.max_output = max_output
+        self._lock = threading.Lock()
+        self.text.write('This file contains any messages produced by compilers etc.\n')
+        self.text.write('It was created by %s\n' % full_version)
+        from .types import shell_quote
+        self.text.write('\n  $ %s\n\n' % ' '.join(shell_quote(a) for a in sys.argv))
+        self._json({'event': 'start', 'argv': sys.argv, 'version': full_version,
+                'time': time.time()})
+
+    def _json(self, obj):
+        import json
+        self.json.write(json.dumps(obj, sort_keys=True))
+        self.json.write('\n')
+
+    def command(self, argv, cwd, start, duration, status, output, input=None):
+        ''' Record one finished command.
+
+            If it failed, what it was given on stdin is recorded too,
+            since for a probe that is the code that didn't compile.
+        '''
+        if not status or input is None:
+            input = None
+        else:
+            input = input.decode('utf-8', 'replace')
+        truncated = len(output) > self.max_output
+        if truncated:
+            output = output[:self.max_output]
+        # compilers may say anything, but json wants unicode
+        output = output.decode('utf-8', 'replace')
+        from .types import shell_quote
+        stamp = time.strftime('%H:%M:%S', time.localtime(start))
+        with self._lock:
+            self.text.write('%s (%.3fs) in %s\n' % (stamp, duration, cwd))
+            self.text.write('$ %s\n' % ' '.join(shell_quote(a) for a in argv))
+            if input is not None:
+                self.text.write('with stdin:\n')
+                for line in input.encode('utf-8').splitlines():
+                    self.text.write('| %s\n' % line)
+            if output:
+                self.text.write(output.encode('utf-8'))
+                if not output.endswith('\n'):
+                    self.text.write('\n')
+            if truncated:
+                self.text.write('[output truncated]\n')
+            self.text.write('[exit %d]\n\n' % status)
+            self._json({'event': 'command', 'argv': argv, 'cwd': cwd,
+                    'start': start, 'duration': duration, 'status': status,
+                    'output': output, 'truncated': truncated,
+                    'input': input})
+
+    def close(self, error=None):
+        with self._lock:
+            if error is None:
+                self.text.write('configure: exit 0\n')
+            else:
+                self.text.write('configure: failed: %s\n' % error)
+            self._json({'event': 'end', 'time': time.time(),
+                    'error': None if error is None else repr(error)})
+            self.text.close()
+            self.json.close()
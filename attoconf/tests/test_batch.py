@@ -0,0 +1,71 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from attoconf.lib.batch import check_features, merge, header, decl, function
+from attoconf.tests.util import fake_cc_build
+
+# fails whenever the source (on stdin) mentions "broken",
+# or uses thing without including thing.h, which declares it
+fake_cc = '''
+import sys
+src = sys.stdin.read() if '-' in sys.argv else ''
+if 'broken' in src:
+    sys.exit('broken!')
+if '(void)thing;' in src and '#include <thing.h>' not in src:
+    sys.exit('thing undeclared')
+'''
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.build = fake_cc_build(self.dir, fake_cc)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_merge(self):
+        src = merge([header('stdio.h'), function('puts', ['stdio.h'])])
+        self.assertEqual(src.count('#include <stdio.h>'), 1)
+        self.assertIn('atto_check_1();', src)
+
+    def test_bisect(self):
+        features = [header('h%d.h' % i) for i in range(10)]
+        features[3] = header('broken.h')
+        features[7] = function('broken')
+        results = check_features(self.build, features)
+        self.assertEqual(results.keys(), [f.name for f in features])
+        self.assertEqual([k for k, v in results.items() if not v],
+                ['HAVE_BROKEN_H', 'HAVE_BROKEN'])
+        # nothing left over in the build dir
+        self.assertEqual(os.listdir(self.dir), ['fake-cc'])
+        self.build.join()
+
+    def test_isolated(self):
+        # thing is only declared by thing.h, so decl_thing must fail
+        # even though another feature includes it
+        features = [header('thing.h'), decl('thing'),
+                header('stdio.h'), function('puts', ['stdio.h'])]
+        results = check_features(self.build, features)
+        self.assertEqual(results.values(), [True, False, True, True])
+        self.build.join()
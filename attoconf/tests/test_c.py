@@ -0,0 +1,190 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from attoconf.lib.c import TestError, submit_syntax_c, submit_compile_c, \
+        submit_compile_link_c, submit_compile_link2_c, try_compile_c, \
+        try_compile_link_c, c_macros, export_facts, Macros
+from attoconf.tests.util import fake_cc_build
+
+# logs its arguments, and fails if -fbroken is among them
+fake_cc = '''
+import sys
+with open(sys.argv[1], 'a') as log:
+    log.write(' '.join(sys.argv[2:]) + '\\n')
+if '-fbroken' in sys.argv:
+    sys.exit('broken!')
+if '-dM' in sys.argv:
+    print('#define __GNUC__ 4')
+    if '-include' in sys.argv:
+        with open(sys.argv[sys.argv.index('-include') + 1]) as f:
+            print(f.read())
+'''
+
+# some of what gcc -dM -E says on x86_64
+gcc_macros = '''#define __ORDER_LITTLE_ENDIAN__ 1234
+#define __GNUC__ 12
+#define __SIZEOF_POINTER__ 8
+#define __x86_64__ 1
+#define __GNUC_PATCHLEVEL__ 0
+#define __SSE2__ 1
+#define __has_include(STR) __has_include__(STR)
+#define __BYTE_ORDER__ __ORDER_LITTLE_ENDIAN__
+#define __ORDER_BIG_ENDIAN__ 4321
+#define __INT64_C(c) c ## L
+#define __GNUC_MINOR__ 2
+#define __INT_MAX__ 0x7fffffff
+#define __LONG_MAX__ 0x7fffffffffffffffL
+#define __STDC__ 1
+#define __STDC_HOSTED__ 1
+#define __linux 1
+#define __VERSION__ "12.2.0"
+#define __ELF__ 1
+'''
+
+# and what clang says for 32-bit big-endian arm
+clang_macros = '''#define __clang__ 1
+#define __clang_major__ 15
+#define __clang_minor__ 0
+#define __clang_patchlevel__ 7
+#define __GNUC__ 4
+#define __GNUC_MINOR__ 2
+#define __arm__ 1
+#define __ARM_NEON 1
+#define __BYTE_ORDER__ __ORDER_BIG_ENDIAN__
+#define __ORDER_LITTLE_ENDIAN__ 1234
+#define __ORDER_BIG_ENDIAN__ 4321
+#define __ILP32__ 1
+'''
+
+class TestMacros(unittest.TestCase):
+    def test_gcc(self):
+        m = Macros.parse(gcc_macros)
+        self.assertEqual(m.compiler(), ('gcc', '12.2.0'))
+        self.assertEqual(m.arch(), 'x86_64')
+        self.assertEqual(m.endianness(), 'little')
+        self.assertEqual(m.pointer_size(), 8)
+        self.assertTrue(m.defined('__SSE2__'))
+        self.assertFalse(m.defined('__ARM_NEON'))
+        self.assertTrue(m.defined('__has_include'))
+        self.assertEqual(m.value('__VERSION__'), '"12.2.0"')
+        self.assertEqual(m.int_value('__INT_MAX__'), 2**31 - 1)
+        self.assertEqual(m.int_value('__LONG_MAX__'), 2**63 - 1)
+        self.assertEqual(m.int_value('__VERSION__', -1), -1)
+
+    def test_clang(self):
+        m = Macros.parse(clang_macros)
+        self.assertEqual(m.compiler(), ('clang', '15.0.7'))
+        self.assertEqual(m.arch(), 'arm')
+        self.assertEqual(m.endianness(), 'big')
+        self.assertEqual(m.pointer_size(), 4)
+        self.assertTrue(m.defined('__ARM_NEON'))
+
+    def test_unknown(self):
+        m = Macros({})
+        self.assertEqual(m.compiler(), (None, None))
+        self.assertEqual(m.arch(), None)
+        self.assertEqual(m.endianness(), None)
+        self.assertEqual(m.pointer_size(), None)
+
+class TestProbes(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.log = os.path.join(self.dir, 'log')
+        self.build = fake_cc_build(self.dir, fake_cc, self.log)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def commands(self):
+        with open(self.log) as f:
+            return f.read().splitlines()
+
+    def test_modes(self):
+        submit_syntax_c(self.build, 'int x;\n')
+        submit_compile_c(self.build, 'int y;\n')
+        self.build.join()
+        self.assertEqual(self.commands(), [
+            '-fsyntax-only -x c -',
+            '-pipe -c -x c - -o /dev/null',
+        ])
+
+    def test_redundant(self):
+        submit_compile_link2_c(self.build, 'int main() {}\n')
+        submit_compile_link_c(self.build, 'int main() {}\n')
+        submit_compile_c(self.build, 'int main() {}\n')
+        submit_syntax_c(self.build, 'int main() {}\n', CFLAGS=['-DX'])
+        self.build.join()
+        # two links, but the compile-only check was implied;
+        # the syntax check has different flags so it must run
+        self.assertEqual(len(self.commands()), 4)
+        self.assertEqual(sorted(os.listdir(self.dir)), ['fake-cc', 'log'])
+
+    def test_macros(self):
+        self.assertEqual(c_macros(self.build).compiler(), ('gcc', '4'))
+        c_macros(self.build)
+        c_macros(self.build, CFLAGS=['-m32'])
+        # only asked once for each set of flags
+        self.assertEqual([c for c in self.commands() if '-dM' in c], [
+            '-dM -E -x c -',
+            '-m32 -dM -E -x c -',
+        ])
+        export_facts(self.build, 'CC', c_macros(self.build),
+                ['__GNUC__', '__SSE2__'])
+        self.assertEqual(self.build.vars['CC_FAMILY'], 'gcc')
+        self.assertEqual(self.build.vars['CC_ARCH'], '')
+        self.assertEqual(self.build.vars['CC_MACRO___GNUC__'], '4')
+        self.assertEqual(self.build.vars['CC_MACRO___SSE2__'], '')
+        self.assertNotIn('__GNUC__', self.build.vars)
+
+    def test_macros_include(self):
+        header = os.path.join(self.dir, 'foo.h')
+        for value in ['1', '2']:
+            with open(header, 'w') as f:
+                f.write('#define FOO %s\n' % value)
+            # same flags, but the header changed
+            macros = c_macros(self.build, CPPFLAGS=['-include', 'foo.h'])
+            self.assertEqual(macros.value('FOO'), value)
+        self.assertIn(header, self.build.files)
+
+    def test_fallback(self):
+        submit_compile_link_c(self.build, 'int main() {}\n', LDFLAGS=['-fbroken'])
+        future = submit_compile_c(self.build, 'int main() {}\n')
+        # the link failed, so the compile had to be tried after all
+        future.result()
+        self.assertEqual(len(self.commands()), 2)
+        with self.assertRaises(TestError):
+            self.build.join()
+
+    def test_sync(self):
+        # checks written before probes ran in the background still work
+        def check(build):
+            try:
+                try_compile_link_c(build, 'int main() {}\n', LDFLAGS=['-fbroken'])
+            except TestError:
+                return 'no'
+            return 'yes'
+        self.assertEqual(check(self.build), 'no')
+        try_compile_c(self.build, 'int main() {}\n')
+        # and the failure they handled isn't reported again
+        self.build.join()
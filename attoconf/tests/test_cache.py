@@ -0,0 +1,169 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+from cStringIO import StringIO
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from attoconf.core import Build, Project
+from attoconf.lib.cache import ProbeCache, cache_key, cached_exec, get_cache
+from attoconf.lib.fingerprint import fingerprint, identity
+from attoconf.types import ShellCommand
+from attoconf.tests.test_core import ReplacingStdout
+
+class TestProbeCache(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file = os.path.join(self.dir, 'sub', 'probes.cache')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_roundtrip(self):
+        key = cache_key('probe', ['gcc', '-c'], 'int main() {}\n')
+        cache = ProbeCache(self.file)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, 0, 'warning: \xff\n')
+        cache.put('failed', 1, 'error: no\n')
+        cache.save()
+
+        cache = ProbeCache(self.file)
+        self.assertEqual(cache.get(key), (0, 'warning: \xff\n'))
+        self.assertEqual(cache.get('failed'), (1, 'error: no\n'))
+
+    def test_merge(self):
+        a = ProbeCache(self.file)
+        b = ProbeCache(self.file)
+        a.put('a', 0, 'A')
+        b.put('b', 0, 'B')
+        a.save()
+        b.save()
+        c = ProbeCache(self.file)
+        self.assertEqual(c.get('a'), (0, 'A'))
+        self.assertEqual(c.get('b'), (0, 'B'))
+
+    def test_evict(self):
+        cache = ProbeCache(self.file, max_size=25)
+        cache.put('old', 0, 'x' * 10)
+        cache.put('new', 0, 'y' * 10)
+        # don't depend on the clock ticking between the two
+        cache.entries['old'][0] -= 1
+        cache.save()
+        cache = ProbeCache(self.file, max_size=25)
+        self.assertIsNone(cache.get('old'))
+        self.assertEqual(cache.get('new'), (0, 'y' * 10))
+
+    def test_cached_exec(self):
+        build = Build(Project('.'), self.dir)
+        build.vars.update({'CACHE_FILE': self.file})
+        runs = []
+        def run(status):
+            runs.append(status)
+            return status, 'out'
+        for status in [0, 0, 1, 1, -2, -2]:
+            self.assertEqual(cached_exec(build, str(status),
+                    lambda: run(status)), (status, 'out'))
+        # killed by a signal is not an answer
+        self.assertEqual(runs, [0, 1, -2, -2])
+
+class TestFingerprint(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.build = Build(Project('.'), self.dir)
+        self.build.vars.update({'CACHE_FILE': ''})
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def tool(self, name, delay):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as f:
+            f.write('#!/bin/sh\necho $0 >> %s/log\nsleep %s\necho %s\n'
+                    % (self.dir, delay, name))
+        os.chmod(path, 0755)
+        return ShellCommand([path])
+
+    def test_parallel(self):
+        slow = self.tool('slow', 0.3)
+        fast = self.tool('fast', 0)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(
+                fingerprint(self.build, slow))) for _ in range(2)]
+        for t in threads:
+            t.start()
+        # let them get going
+        time.sleep(0.05)
+        start = time.time()
+        fingerprint(self.build, fast)
+        # didn't have to wait for the other tool
+        self.assertLess(time.time() - start, 0.25)
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(results)), 1)
+        with open(os.path.join(self.dir, 'log')) as f:
+            log = f.read().split()
+        # --version and -dumpmachine, once each, for each tool
+        self.assertEqual(sorted(os.path.basename(l) for l in log),
+                ['fast', 'fast', 'slow', 'slow'])
+
+    def test_path(self):
+        self.tool('here', 0)
+        tool = ShellCommand(['here'])
+        self.assertIsNone(identity(tool, {'PATH': '/nonexistent'}))
+        # found in the PATH it will be run with, not os.environ's
+        self.build.env = {'PATH': self.dir}
+        self.assertEqual(identity(tool, self.build.env)[0],
+                os.path.realpath(os.path.join(self.dir, 'here')))
+        self.assertNotEqual(fingerprint(self.build, tool),
+                cache_key('missing', tool.list))
+
+class TestGetCache(unittest.TestCase):
+    def test_env(self):
+        dir = tempfile.mkdtemp()
+        try:
+            build = Build(Project('.'), dir)
+            build.vars.update({'CACHE_FILE': ''})
+            with ReplacingStdout(StringIO()):
+                build.configure([], {'ATTOCONF_CACHE_DIR': dir})
+            # from what configure was given, not os.environ
+            self.assertEqual(get_cache(build).filename,
+                    os.path.join(dir, 'probes.cache'))
+        finally:
+            shutil.rmtree(dir)
+
+    def test_env_relative(self):
+        dir = tempfile.mkdtemp()
+        cwd = os.getcwd()
+        try:
+            os.chdir(dir)
+            os.mkdir('build')
+            build = Build(Project('.'), 'build')
+            build.vars.update({'CACHE_FILE': ''})
+            with ReplacingStdout(StringIO()):
+                build.configure([], {'ATTOCONF_CACHE_DIR': 'cache'})
+            # relative to where configure was run, not the build dir
+            self.assertEqual(get_cache(build).filename,
+                    os.path.join(os.getcwd(), 'cache', 'probes.cache'))
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(dir)
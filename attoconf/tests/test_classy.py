@@ -0,0 +1,118 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from attoconf.lib.install import Install
+
+root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+heavy = ['subprocess', 'tempfile', 'hashlib', 'json', 'pipes', 'shlex', 'Queue',
+        # only needed once configuring (or tracing) starts
+        'attoconf.image', 'attoconf.trace', 'attoconf.jobs', 'attoconf.log',
+        'attoconf.files']
+
+help_only = '''from __future__ import print_function
+import sys
+from cStringIO import StringIO
+from attoconf.lib.c import Cxx
+from attoconf.lib.config_hash import ConfigHash
+from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+from attoconf.lib.pkg_config import PkgConfig
+
+class Configuration(PkgConfig, Cxx, Install, ConfigHash, Make):
+    pass
+
+proj = Configuration(srcdir='.', package='foo', package_name='Foo',
+        required_packages=[], optional_packages=[])
+proj.build('.')
+proj.help.print(StringIO(), True)
+print(' '.join(m for m in %r if sys.modules.get(m) is not None))
+''' % (heavy,)
+
+configure_only = '''from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+
+class Configuration(Install, Make):
+    pass
+
+proj = Configuration(srcdir='.', package='foo', package_name='Foo')
+proj.build('.').configure([], {})
+'''
+
+# config.status with no args, but staying around to look
+regenerate_only = '''from __future__ import print_function
+import sys
+sys.argv = ['./config.status']
+try:
+    execfile('config.status')
+except SystemExit as e:
+    assert not e.code
+print(' '.join(m for m in %r if sys.modules.get(m) is not None))
+''' % ([m for m in heavy if m not in ('attoconf.trace', 'attoconf.files')]
+        + ['attoconf.lib.c'],)
+
+class TestStartup(unittest.TestCase):
+    def test_help_imports(self):
+        env = dict(os.environ, PYTHONPATH=root)
+        p = subprocess.Popen([sys.executable, '-c', help_only],
+                stdout=subprocess.PIPE, env=env)
+        out, _ = p.communicate()
+        self.assertEqual(p.wait(), 0)
+        self.assertEqual(out.split(), [])
+
+    def test_regenerate_imports(self):
+        dir = tempfile.mkdtemp()
+        try:
+            with open(os.path.join(dir, 'Makefile.in'), 'w') as f:
+                f.write('all:\n')
+            env = dict(os.environ, PYTHONPATH=root)
+            with open(os.devnull, 'w') as null:
+                subprocess.check_call([sys.executable, '-c', configure_only],
+                        cwd=dir, stdout=null, env=env)
+                p = subprocess.Popen([sys.executable, '-c', regenerate_only],
+                        cwd=dir, stdout=subprocess.PIPE, env=env)
+                out, _ = p.communicate()
+            self.assertEqual(p.wait(), 0)
+            # just the output hooks, not the configure machinery
+            self.assertEqual(out.splitlines()[-1].split(), [])
+        finally:
+            shutil.rmtree(dir)
+
+class Package(Install):
+    pass
+
+class TestPackage(unittest.TestCase):
+    def test_keyword(self):
+        proj = Package('.', package='foo', package_name='Foo')
+        self.assertEqual(proj.package, 'foo')
+        # registered exactly once
+        self.assertEqual(proj.order.count('PACKAGE'), 1)
+
+    def test_later(self):
+        proj = Package('.')
+        self.assertEqual(proj.order, [])
+        proj.set_package('foo', 'Foo')
+        self.assertEqual(proj.order.count('PACKAGE'), 1)
@@ -19,12 +19,14 @@ from __future__ import print_function, division, absolute_import
 
 import unittest
 
-from attoconf.core import Project, Build
-from attoconf.types import uint, shell_word, shell_partial_word, maybe
+from attoconf.core import Project, Build, Tracker, _tracking, uses, value_key
+from attoconf.types import uint, shell_word, shell_partial_word, maybe, FlagList
 
 import os
 from cStringIO import StringIO
+import shutil
 import sys
+import tempfile
 
 class ReplacingStdout(object):
     __slots__ = ('old', 'new')
@@ -95,6 +97,17 @@ General:
         self.assertEquals(build.builddir, 'bar')
         self.assertEquals(build.relative_source(), '../foo')
 
+    def test_init_copied(self):
+        proj = Project('.')
+        proj.add_option('FLAGS', init=['-O2'],
+                type=FlagList, check=None,
+                help='help for FLAGS', hidden=False)
+        build1 = Build(proj, '.')
+        build1.vars['FLAGS'] += ['-g']
+        build2 = Build(proj, '.')
+        self.assertEqual(build1.vars['FLAGS'].list, ['-O2', '-g'])
+        self.assertEqual(build2.vars['FLAGS'].list, ['-O2'])
+
     def test_configure(self):
         def check_foo(bld, FOO):
             self.assertEqual(FOO, 'B')
@@ -130,6 +143,11 @@ General:
                     '--qux': 'b',
                 })
         os.remove('config.status')
+        os.remove('config.log')
+        os.remove('config.log.jsonl')
+        os.remove('config.snapshot')
+        os.remove('config.graph')
+        os.remove('config.digest')
         self.assertEqual(build.vars,
                 {
                     'FOO': 'B',
@@ -137,3 +155,95 @@ General:
                     'QUX': '',
                     'VAR': 'value',
                 })
+
+    def test_tracking(self):
+        proj = Project('.')
+        build = Build(proj, '.')
+        build.vars.update({'A': 'a', 'B': FlagList(['-x'])})
+        tracker = Tracker(build)
+        _tracking.tracker = tracker
+        try:
+            build.vars['C'] = build.vars['A'] + '!'
+            build.vars['B'] += ['-y']
+            self.assertNotIn('D', build.vars)
+            build.files.add('foo.in')
+        finally:
+            _tracking.tracker = None
+        record = tracker.record('test')
+        # C was written before it was read
+        self.assertEqual(sorted(record.reads), ['A', 'B', 'D'])
+        self.assertEqual(record.reads['D'], None)
+        self.assertEqual(sorted(record.writes), ['B', 'C'])
+        self.assertEqual(record.writes['C'], value_key('a!'))
+        self.assertEqual(record.files, frozenset(['foo.in']))
+
+    def test_incremental(self):
+        calls = []
+        @uses(reads=['A'], writes=['B'])
+        def check_b(build):
+            calls.append('B')
+            build.vars['B'] = build.vars['A'] + 'b'
+        @uses(reads=['C'], writes=['D'])
+        def check_d(build):
+            calls.append('D')
+            build.vars['D'] = build.vars['C'] + 'd'
+        @uses(reads=['B', 'D'], writes=['E'])
+        def check_e(build):
+            calls.append('E')
+            build.vars['E'] = build.vars['B'] + build.vars['D']
+        def check_all(build):
+            calls.append('*')
+
+        proj = Project('.')
+        proj.checks = [check_b, check_d, check_e, check_all]
+        tmp = tempfile.mkdtemp()
+        try:
+            with ReplacingStdout(StringIO()):
+                build = Build(proj, tmp)
+                build.vars.update({'A': 'a', 'C': 'c'})
+                build.finish()
+                self.assertEqual(calls, ['B', 'D', 'E', '*'])
+
+                del calls[:]
+                build2 = Build(proj, tmp)
+                build2.vars.update({'A': 'x', 'C': 'c'})
+                build2.finish(build.graph)
+                self.assertEqual(calls, ['B', 'E', '*'])
+                self.assertEqual(build2.vars['D'], 'cd')
+                self.assertEqual(build2.vars['E'], 'xbcd')
+                self.assertIs(build2.graph[1], build.graph[1])
+
+                del calls[:]
+                build3 = Build(proj, tmp)
+                build3.vars.update({'A': 'x', 'C': 'c'})
+                build3.finish(build2.graph)
+                self.assertEqual(calls, ['*'])
+                self.assertEqual(build3.vars, build2.vars)
+        finally:
+            shutil.rmtree(tmp)
+
+    def test_failed_finish(self):
+        import time
+        def probe(build):
+            time.sleep(0.05)
+            build.log.command(['cc', '-'], build.builddir, time.time(), 0,
+                    1, 'error: nope\n', 'int main() { nope; }\n')
+        def check_fail(build):
+            build.jobs.submit(probe, build)
+            raise ValueError('check failed')
+        proj = Project('.')
+        proj.checks = [check_fail]
+        tmp = tempfile.mkdtemp()
+        try:
+            build = Build(proj, tmp)
+            build.jobs.max_jobs = 2
+            with self.assertRaises(ValueError):
+                build.finish()
+            # the probe finished (and logged) before the log was closed
+            self.assertIs(build.log, None)
+            with open(os.path.join(tmp, 'config.log')) as f:
+                log = f.read()
+            self.assertIn('| int main() { nope; }\n', log)
+            self.assertTrue(log.endswith('configure: failed: check failed\n'))
+        finally:
+            shutil.rmtree(tmp)
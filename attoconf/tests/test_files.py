@@ -0,0 +1,74 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from attoconf.files import OutputFile
+
+class TestOutputFile(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'out')
+        self.umask = os.umask(022)
+
+    def tearDown(self):
+        os.umask(self.umask)
+        shutil.rmtree(self.dir)
+
+    def write(self, text, mode=0666):
+        with OutputFile(self.path, mode) as out:
+            out.write(text)
+        self.assertEqual(os.listdir(self.dir), ['out'])
+        return out.changed
+
+    def test_new(self):
+        self.assertTrue(self.write('foo\n', 0777))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0755)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'foo\n')
+
+    def test_unchanged(self):
+        self.write('foo\n')
+        before = os.stat(self.path)
+        self.assertFalse(self.write('foo\n'))
+        after = os.stat(self.path)
+        self.assertEqual((before.st_ino, before.st_mtime),
+                (after.st_ino, after.st_mtime))
+
+    def test_changed(self):
+        self.write('foo\n')
+        os.chmod(self.path, 0600)
+        self.assertTrue(self.write('bar\n'))
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0600)
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'bar\n')
+
+    def test_error(self):
+        self.write('foo\n')
+        with self.assertRaises(ValueError):
+            with OutputFile(self.path) as out:
+                out.write('partial')
+                raise ValueError
+        self.assertEqual(os.listdir(self.dir), ['out'])
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'foo\n')
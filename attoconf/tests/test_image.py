@@ -0,0 +1,114 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+from cStringIO import StringIO
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+from attoconf import image
+from attoconf.lib.c import C
+from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+
+class Project(C, Install, Make):
+    pass
+
+class Lambda(Install):
+    def vars(self):
+        super(Lambda, self).vars()
+        self.checks.append(lambda build: None)
+
+def help_text(proj):
+    out = StringIO()
+    proj.help.print(out, True)
+    return out.getvalue()
+
+class TestImage(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.dir, 'images', 'x.pickle')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_round_trip(self):
+        proj = Project('.', package='foo', package_name='Foo')
+        self.assertTrue(image.save(proj, self.filename))
+        again = Project('.')
+        self.assertTrue(image.load(again, self.filename))
+        self.assertEqual(again.order, proj.order)
+        self.assertEqual(sorted(again.options), sorted(proj.options))
+        self.assertEqual(help_text(again), help_text(proj))
+        self.assertEqual(len(again.checks), len(proj.checks))
+        # methods are rebound to the new project, not the old one
+        self.assertIs(again.options['--help'].type.im_self, again)
+
+    def test_unpicklable(self):
+        proj = Lambda('.', package='foo', package_name='Foo')
+        self.assertFalse(image.save(proj, self.filename))
+        self.assertEqual(os.listdir(os.path.dirname(self.filename)), [])
+        self.assertFalse(image.load(Lambda('.'), self.filename))
+
+    def test_key(self):
+        script = os.path.join(self.dir, 'configure')
+        with open(script, 'w') as f:
+            f.write('# one\n')
+        foo = Project('.', package='foo', package_name='Foo')
+        bar = Project('.', package='bar', package_name='Foo')
+        key = image.image_key(foo, script)
+        self.assertEqual(key, image.image_key(foo, script))
+        self.assertNotEqual(key, image.image_key(bar, script))
+        with open(script, 'w') as f:
+            f.write('# two\n')
+        self.assertNotEqual(key, image.image_key(foo, script))
+
+    def test_private(self):
+        proj = Project('.', package='foo', package_name='Foo')
+        self.assertTrue(image.save(proj, self.filename))
+        os.chmod(self.filename, 0666)
+        self.assertFalse(image.load(Project('.'), self.filename))
+        os.chmod(self.filename, 0644)
+        self.assertTrue(image.load(Project('.'), self.filename))
+        os.chmod(os.path.dirname(self.filename), 0777)
+        self.assertFalse(image.load(Project('.'), self.filename))
+        # saving again fixes that
+        self.assertTrue(image.save(proj, self.filename))
+        self.assertTrue(image.load(Project('.'), self.filename))
+
+    def test_local_modules(self):
+        script = os.path.join(self.dir, 'configure')
+        helper = os.path.join(self.dir, 'atto_test_helper.py')
+        with open(script, 'w') as f:
+            f.write('import atto_test_helper\n')
+        with open(helper, 'w') as f:
+            f.write('X = 1\n')
+        sys.path.insert(0, self.dir)
+        try:
+            import atto_test_helper
+            foo = Project(self.dir, package='foo', package_name='Foo')
+            key = image.image_key(foo, script)
+            with open(helper, 'w') as f:
+                f.write('X = 2\n')
+            self.assertNotEqual(key, image.image_key(foo, script))
+        finally:
+            del sys.path[0]
+            del sys.modules['atto_test_helper']
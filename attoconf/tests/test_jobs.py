@@ -0,0 +1,118 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+from cStringIO import StringIO
+import threading
+import unittest
+
+from attoconf.jobs import JobPool, check_deps, run_checks
+from attoconf.tests.test_core import ReplacingStdout
+
+class TestJobPool(unittest.TestCase):
+    def test_results(self):
+        for n in [1, 4]:
+            pool = JobPool(n)
+            futures = [pool.submit(lambda i: i * i, i) for i in range(10)]
+            pool.join()
+            self.assertEqual([f.result() for f in futures],
+                    [i * i for i in range(10)])
+
+    def test_concurrent(self):
+        pool = JobPool(2)
+        barrier = threading.Event()
+        # would deadlock if the two jobs could not run at the same time
+        pool.submit(barrier.wait)
+        pool.submit(barrier.set)
+        pool.join()
+
+    def test_first_error(self):
+        def fail(what):
+            raise ValueError(what)
+        for n in [1, 4]:
+            pool = JobPool(n)
+            pool.submit(lambda: None)
+            pool.submit(fail, 'first')
+            pool.submit(fail, 'second')
+            with self.assertRaisesRegexp(ValueError, 'first'):
+                pool.join()
+            # failures are only reported once
+            pool.join()
+
+    def test_claimed(self):
+        def fail():
+            raise ValueError('expected')
+        pool = JobPool(4)
+        future = pool.submit(fail)
+        with self.assertRaises(ValueError):
+            future.result()
+        # the submitter already dealt with it
+        pool.join()
+
+
+def declared(reads, writes):
+    def check(build):
+        pass
+    check.reads = frozenset(reads)
+    check.writes = frozenset(writes)
+    return check
+
+class TestSchedule(unittest.TestCase):
+    def test_deps(self):
+        checks = [
+            declared([], ['A']),
+            declared(['A'], ['B']),
+            declared([], ['C']),
+            declared(['B', 'C'], []),
+            declared([], ['A']),
+            lambda build: None,
+            declared([], ['D']),
+        ]
+        self.assertEqual(check_deps(checks), [
+            set(),
+            {0},
+            set(),
+            {1, 2},
+            # write-after-write and write-after-read
+            {0, 1},
+            # undeclared waits for everything
+            {0, 1, 2, 3, 4},
+            # and everything waits for it
+            {5},
+        ])
+
+    def test_output(self):
+        release = threading.Event()
+        def slow(build):
+            release.wait()
+            print('slow')
+        def fast(build):
+            print('fast')
+            release.set()
+        def fail(build):
+            print('fail')
+            raise ValueError('fail')
+        def never(build):
+            print('never')
+        for f in [slow, fast, fail, never]:
+            f.reads = f.writes = frozenset()
+        out = StringIO()
+        with ReplacingStdout(out):
+            with self.assertRaisesRegexp(ValueError, 'fail'):
+                run_checks(None, [slow, fast, fail, never], 2)
+        self.assertEqual(out.getvalue(), 'slow\nfast\nfail\n')
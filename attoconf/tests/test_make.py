@@ -0,0 +1,159 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from attoconf import trace
+from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+from attoconf.tests.util import configure_quietly, quietly
+
+class Project(Install, Make):
+    pass
+
+makefile_in = '''all:
+\t@echo $(PACKAGE) $(PREFIX)
+'''
+
+class TestMake(unittest.TestCase):
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        self.build = tempfile.mkdtemp()
+        with open(os.path.join(self.src, 'Makefile.in'), 'w') as f:
+            f.write(makefile_in)
+
+    def tearDown(self):
+        shutil.rmtree(self.src)
+        shutil.rmtree(self.build)
+
+    def configure(self, **kwargs):
+        proj = Project(srcdir=self.src, package='foo', package_name='Foo',
+                **kwargs)
+        configure_quietly(proj.build(self.build))
+
+    def read(self, name):
+        with open(os.path.join(self.build, name)) as f:
+            return f.read()
+
+    def make(self):
+        return subprocess.check_output(['make', '-s'], cwd=self.build)
+
+    def test_copy(self):
+        self.configure()
+        makefile = self.read('Makefile')
+        self.assertIn('PACKAGE = foo\n', makefile)
+        self.assertTrue(makefile.endswith(makefile_in))
+        self.assertFalse(os.path.exists(os.path.join(self.build, 'config.mk')))
+
+    def test_include(self):
+        self.configure(make_config='config.mk')
+        self.assertIn('PACKAGE = foo\n', self.read('config.mk'))
+        self.assertEqual(self.read('Makefile').splitlines()[1:],
+                ['include config.mk',
+                'include $(SRC_DIR)/Makefile.in'])
+        self.assertEqual(self.make(), 'foo /usr/local\n')
+        # no reconfigure needed
+        with open(os.path.join(self.src, 'Makefile.in'), 'a') as f:
+            f.write('\t@echo again\n')
+        self.assertEqual(self.make(), 'foo /usr/local\nagain\n')
+
+    def test_regenerate(self):
+        self.configure()
+        with open(os.path.join(self.src, 'Makefile.in'), 'a') as f:
+            f.write('\t@echo again\n')
+        # with no args, config.status doesn't run configure
+        os.rename(os.path.join(self.build, 'config.log'),
+                os.path.join(self.build, 'old.log'))
+        # and doesn't even read the graph, which only configure needs
+        with open(os.path.join(self.build, 'config.graph'), 'w') as f:
+            f.write('garbage')
+        out = subprocess.check_output([sys.executable, 'config.status'],
+                cwd=self.build)
+        self.assertEqual(out, 'Generating a makefile ...\n')
+        self.assertFalse(os.path.exists(os.path.join(self.build, 'config.log')))
+        self.assertEqual(self.make(), 'foo /usr/local\nagain\n')
+
+    def reconfigure(self, *args):
+        build = Project(srcdir=self.src, package='foo',
+                package_name='Foo').build(self.build)
+        return quietly(build.configure, list(args), {})
+
+    def test_noop(self):
+        self.assertIn('Generating a makefile', self.reconfigure())
+        makefile = os.path.join(self.build, 'Makefile')
+        before = os.stat(makefile)
+        self.assertEqual(self.reconfigure(),
+                'Nothing changed since the last configure\n')
+        self.assertEqual(os.stat(makefile), before)
+        # the args, the inputs and the outputs all count
+        self.assertIn('Generating', self.reconfigure('--prefix=/opt'))
+        self.assertIn('Nothing changed', self.reconfigure('--prefix=/opt'))
+        with open(os.path.join(self.src, 'Makefile.in'), 'a') as f:
+            f.write('\t@echo again\n')
+        self.assertIn('Generating', self.reconfigure('--prefix=/opt'))
+        os.remove(makefile)
+        self.assertIn('Generating', self.reconfigure('--prefix=/opt'))
+        self.assertEqual(self.make(), 'foo /opt\nagain\n')
+
+    def test_noop_trace(self):
+        name = os.path.join(self.build, 'trace.json')
+        self.reconfigure('--trace=' + name)
+        os.remove(name)
+        try:
+            self.assertIn('Nothing changed', self.reconfigure('--trace=' + name))
+        finally:
+            trace.enable('')
+        self.assertTrue(os.path.exists(name))
+
+    def test_incremental(self):
+        self.reconfigure()
+        out = self.reconfigure('--prefix=/opt')
+        self.assertIn('Generating a makefile', out)
+        self.assertIn('Reused', out)
+        incremental = self.read('Makefile')
+        # same as if it were configured from scratch
+        os.remove(os.path.join(self.build, 'config.digest'))
+        self.assertNotIn('Reused', self.reconfigure('--prefix=/opt'))
+        self.assertEqual(self.read('Makefile'), incremental)
+        # only the hook that copies Makefile.in runs again
+        with open(os.path.join(self.src, 'Makefile.in'), 'a') as f:
+            f.write('\t@echo again\n')
+        out = self.reconfigure('--prefix=/opt')
+        self.assertIn('Generating a makefile', out)
+        checks = Project('.', package='foo', package_name='Foo').checks
+        # i.e. all but it and the barriers
+        n = len([c for c in checks if getattr(c, 'reads', None) is not None])
+        self.assertIn('Reused %d of %d checks' % (n, len(checks)), out)
+        self.assertEqual(self.make(), 'foo /opt\nagain\n')
+
+    def test_recheck(self):
+        self.configure()
+        os.remove(os.path.join(self.build, 'config.snapshot'))
+        os.remove(os.path.join(self.build, 'Makefile'))
+        # no configure script here to rerun
+        p = subprocess.Popen([sys.executable, 'config.status'], cwd=self.build,
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        p.communicate()
+        self.assertNotEqual(p.returncode, 0)
+        self.assertFalse(os.path.exists(os.path.join(self.build, 'Makefile')))
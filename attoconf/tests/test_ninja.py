@@ -0,0 +1,67 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+from attoconf.lib.ninja import escape, Ninja
+from attoconf.tests.util import configure_quietly
+
+class Project(Install, Ninja):
+    pass
+
+class Both(Install, Make, Ninja):
+    pass
+
+class TestNinja(unittest.TestCase):
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        self.build = tempfile.mkdtemp()
+        for name in ['Makefile.in', 'build.ninja.in']:
+            with open(os.path.join(self.src, name), 'w'):
+                pass
+
+    def tearDown(self):
+        shutil.rmtree(self.src)
+        shutil.rmtree(self.build)
+
+    def configure(self, cls, *args):
+        proj = cls(srcdir=self.src, package='foo', package_name='Foo')
+        configure_quietly(proj.build(self.build), args)
+        with open(os.path.join(self.build, 'build.ninja')) as f:
+            return f.read().splitlines()
+
+    def test_escape(self):
+        self.assertEqual(escape('$(FOO) $bar'), '$$(FOO) $$bar')
+        self.assertRaises(ValueError, escape, 'a\nb')
+
+    def test_alone(self):
+        lines = self.configure(Project, '--prefix=/opt/$x')
+        self.assertTrue(lines[1].startswith('SRC_DIR = '))
+        self.assertIn('PREFIX = /opt/$$x', lines)
+        self.assertEqual(lines[-1], 'include $SRC_DIR/build.ninja.in')
+
+    def test_with_make(self):
+        lines = self.configure(Both)
+        self.assertEqual(len([l for l in lines if l.startswith('SRC_DIR = ')]), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.build, 'Makefile')))
@@ -0,0 +1,230 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import unittest
+
+from attoconf.lib.c import C
+from attoconf.lib.pc import PcError, Resolver, compare_versions, parse_pc, parse_requires
+from attoconf.lib.pkg_config import PkgConfig
+from attoconf.tests.util import configure_quietly
+
+def have_pkg_config():
+    try:
+        subprocess.check_output(['pkg-config', '--version'])
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+def have_pkgconf():
+    # the original pkg-config orders things differently, and has no --about
+    try:
+        subprocess.check_output(['pkg-config', '--about'])
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    return True
+
+class TestPc(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.resolver = Resolver([self.dir], ['/usr/include'], ['/usr/lib'])
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def pc(self, name, text):
+        path = os.path.join(self.dir, name + '.pc')
+        with open(path, 'w') as f:
+            f.write(text)
+        return path
+
+    def test_parse(self):
+        path = self.pc('foo', '''# comment
+prefix=/opt/foo
+libdir=${prefix}/lib
+pound=a\\#b # real comment
+
+Name: foo
+Version: 1.2
+Cflags: -I${prefix}/include \\
+    -DFOO
+Libs: -L${libdir} -lfoo
+''')
+        pc = parse_pc(path)
+        self.assertEqual(pc.get('Version'), '1.2')
+        self.assertEqual(pc.get('Cflags'), '-I/opt/foo/include     -DFOO')
+        self.assertEqual(pc.get('Libs'), '-L/opt/foo/lib -lfoo')
+        self.assertEqual(pc.get('Requires'), '')
+
+    def test_undefined(self):
+        path = self.pc('foo', 'Libs: -L${nope}\n')
+        self.assertRaises(PcError, parse_pc, path)
+
+    def test_reparse(self):
+        path = self.pc('foo', 'Version: 1\n')
+        self.assertEqual(parse_pc(path).get('Version'), '1')
+        self.assertIs(parse_pc(path), parse_pc(path))
+        self.pc('foo', 'Version: 22\n')
+        os.utime(path, (time.time() + 10, time.time() + 10))
+        self.assertEqual(parse_pc(path).get('Version'), '22')
+
+    def test_requires(self):
+        self.assertEqual(parse_requires('a, b >= 1.0 c'),
+                [('a', None, None), ('b', '>=', '1.0'), ('c', None, None)])
+        self.assertRaises(PcError, parse_requires, 'a >=')
+
+    def test_versions(self):
+        self.assertEqual(compare_versions('1.10', '1.9'), 1)
+        self.assertEqual(compare_versions('1.0', '1.0.0'), -1)
+        self.assertEqual(compare_versions('1.0~rc1', '1.0'), -1)
+        self.assertEqual(compare_versions('2.a', '2.1'), -1)
+        self.assertEqual(compare_versions('3', '3'), 0)
+
+    def test_resolve(self):
+        self.pc('a', '''Version: 1
+Requires: b >= 2, c
+Cflags: -I/opt/a -DA
+Libs: -L/usr/lib -la
+''')
+        self.pc('b', '''Version: 2.1
+Requires: c
+Requires.private: d
+Cflags: -I/opt/b -I/usr/include
+Libs: -L/opt/lib -lb
+''')
+        self.pc('c', '''Version: 3
+Cflags: -I/opt/a -DA
+Libs: -L/opt/lib -lc -pthread
+''')
+        self.pc('d', '''Version: 4
+Cflags: -DD
+Libs: -ld
+''')
+        r = self.resolver
+        self.assertEqual(r.modversion('a'), '1')
+        self.assertEqual(r.cflags(['a']), (['-I/opt/a', '-I/opt/b'], ['-DD', '-DA']))
+        self.assertEqual(r.libs(['a']), (['-L/opt/lib'], ['-la', '-lb', '-lc', '-pthread']))
+        # several at once is not the same as one after another
+        self.assertEqual(r.cflags(['c', 'd', 'b']), (['-I/opt/a', '-I/opt/b'], ['-DA', '-DD']))
+        self.assertEqual(r.libs(['c', 'd', 'b']),
+                (['-L/opt/lib'], ['-ld', '-lb', '-lc', '-pthread']))
+
+    @unittest.skipUnless(have_pkgconf(), 'needs pkgconf')
+    def test_parity(self):
+        for name, text in [
+                ('a', 'Requires: b, c\nLibs: -L/usr/lib -Wl,--as-needed -la\n'),
+                ('b', 'Requires: c\nRequires.private: d\nLibs: -L/opt/lib -lb -lc\n'),
+                ('c', 'Libs: -L/opt/lib -lc -Wl,-z,now\n'),
+                ('d', 'Libs: -ld\n'),
+                # the second -lq stays: after -Wl,-x, the first one may matter
+                ('e', 'Libs: -Wl,-x -lq -lr -lq -L/opt/e\n'),
+                ('f', 'Libs: -lr -lq -Wl,-y -lq\n')]:
+            self.pc(name, 'Name: %s\nDescription: %s\nVersion: 1.0\n%s'
+                    % (name, name, text))
+        env = dict(os.environ, PKG_CONFIG_LIBDIR=self.dir,
+                PKG_CONFIG_SYSTEM_INCLUDE_PATH='/usr/include',
+                PKG_CONFIG_SYSTEM_LIBRARY_PATH='/usr/lib')
+        for k in ['PKG_CONFIG_PATH', 'PKG_CONFIG_SYSROOT_DIR',
+                'PKG_CONFIG_ALLOW_SYSTEM_LIBS']:
+            env.pop(k, None)
+        def pkg_config(*args):
+            return subprocess.check_output(['pkg-config'] + list(args),
+                    env=env).split()
+        for names in [['a'], ['c', 'd', 'b'], ['b', 'a'], ['e'], ['a', 'e'],
+                ['e', 'd'], ['f'], ['f', 'c']]:
+            self.assertEqual(self.resolver.libs(names),
+                    (pkg_config('--libs-only-L', *names),
+                    pkg_config('--libs-only-l', '--libs-only-other', *names)),
+                    names)
+
+    def test_errors(self):
+        self.pc('a', 'Requires: b > 1\n')
+        self.pc('b', 'Version: 1\n')
+        self.pc('c', 'Conflicts: a\n')
+        self.pc('d-uninstalled', 'Version: 1\n')
+        self.pc('e', 'Libs: -Wl,--whole-archive -le -Wl,--no-whole-archive\n')
+        for name in ['a', 'c', 'd', 'e', 'missing']:
+            self.assertRaises(PcError, self.resolver.libs, [name])
+
+
+class Project(PkgConfig, C):
+    pass
+
+class TestPkgConfig(unittest.TestCase):
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        self.env = os.environ.copy()
+        for k in ['PKG_CONFIG_PATH', 'PKG_CONFIG_SYSROOT_DIR']:
+            os.environ.pop(k, None)
+        os.environ['PKG_CONFIG_LIBDIR'] = self.src
+        for name, text in [
+                ('a', 'Requires: b\nCflags: -I/opt/a\nLibs: -la\n'),
+                ('b', 'Cflags: -I/opt/b -DB\nLibs: -L/opt/lib -lb\n'),
+                ('c', 'Cflags: -I/opt/a\nLibs: -lc -lb\n')]:
+            with open(os.path.join(self.src, name + '.pc'), 'w') as f:
+                f.write('Name: %s\nDescription: %s\nVersion: 1.0\n%s' % (name, name, text))
+
+    def tearDown(self):
+        os.environ.clear()
+        os.environ.update(self.env)
+        shutil.rmtree(self.src)
+
+    def configure(self, *args):
+        proj = Project(srcdir=self.src,
+                required_packages=['a'], optional_packages=['c'])
+        build = proj.build(self.src)
+        out = configure_quietly(build, args)
+        return build.vars, out
+
+    def flags(self, vars):
+        return [str(vars[k]) for k in ['CPPFLAGS', 'CFLAGS', 'LDFLAGS', 'LIBS']]
+
+    def test_native(self):
+        vars, out = self.configure()
+        self.assertIn("Found dependency 'a': 1.0\nFound dependency 'c': 1.0\n", out)
+        self.assertEqual(self.flags(vars),
+                ['-I/opt/a -I/opt/b', '-O2 -g -DB', '-L/opt/lib', '-la -lc -lb'])
+
+    def test_without(self):
+        vars, out = self.configure('--with-c=no')
+        self.assertNotIn("'c'", out)
+        self.assertEqual(self.flags(vars),
+                ['-I/opt/a -I/opt/b', '-O2 -g -DB', '-L/opt/lib', '-la -lb'])
+
+    @unittest.skipUnless(have_pkg_config(), 'needs pkg-config')
+    def test_tool(self):
+        vars, out = self.configure('--native-pkg-config=no')
+        self.assertEqual(self.flags(vars), self.flags(self.configure()[0]))
+
+    @unittest.skipUnless(have_pkg_config(), 'needs pkg-config')
+    def test_tool_args(self):
+        # flags with arguments, and ones that aren't -I, -L or -l
+        with open(os.path.join(self.src, 'g.pc'), 'w') as f:
+            f.write('Name: g\nDescription: g\nVersion: 1.0\n'
+                    'Cflags: -isystem /opt/g/include -pthread -I/opt/g\n'
+                    'Libs: -L/opt/g -Wl,-rpath,/opt/g -lg -framework Foo -pthread\n')
+        proj = Project(srcdir=self.src, required_packages=['g'], optional_packages=[])
+        build = proj.build(self.src)
+        configure_quietly(build, ['--native-pkg-config=no'])
+        self.assertEqual(self.flags(build.vars), ['-I/opt/g',
+                '-O2 -g -isystem /opt/g/include -pthread', '-L/opt/g',
+                '-Wl,-rpath,/opt/g -lg -framework Foo -pthread'])
@@ -0,0 +1,86 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from attoconf.lib.install import Install
+from attoconf.lib.stamps import c_string, Stamps
+
+class Project(Install, Stamps):
+    pass
+
+class TestStamps(unittest.TestCase):
+    def setUp(self):
+        self.build = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.build)
+
+    def configure(self, *args, **kwargs):
+        proj = Project(srcdir='.', package='foo', package_name='Foo', **kwargs)
+        build = proj.build(self.build)
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            for arg in args:
+                build.apply_arg(arg)
+            build.finish()
+        finally:
+            sys.stdout = stdout
+
+    def path(self, name):
+        return os.path.join(self.build, 'config', name)
+
+    def read(self, name):
+        with open(self.path(name)) as f:
+            return f.read()
+
+    def test_c_string(self):
+        self.assertEqual(c_string('/usr/local'), '"/usr/local"')
+        self.assertEqual(c_string('a"b\\c'), r'"a\"b\\c"')
+        self.assertEqual(c_string('\t1'), r'"\0111"')
+
+    def test_per_var(self):
+        self.configure()
+        self.assertIn('#define PREFIX "/usr/local"\n', self.read('prefix.h'))
+        self.assertIn('#define PACKAGE "foo"\n', self.read('package.h'))
+        names = os.listdir(os.path.join(self.build, 'config'))
+        for name in names:
+            os.utime(self.path(name), (0, 0))
+        self.configure('--prefix=/opt', '--datarootdir=/usr/local/share')
+        changed = sorted(n for n in names
+                if os.stat(self.path(n)).st_mtime != 0)
+        # everything else depends on DATAROOTDIR instead
+        self.assertEqual(changed, ['bindir.h', 'eprefix.h', 'exec_prefix.h',
+                'includedir.h', 'libdir.h', 'libexecdir.h', 'localstatedir.h',
+                'prefix.h', 'sbindir.h', 'sharedstatedir.h', 'sysconfdir.h'])
+
+    def test_groups(self):
+        self.configure(stamp_vars=['PACKAGE'],
+                stamp_groups=[('dirs', ['BINDIR', 'DATADIR'])])
+        self.assertEqual(sorted(os.listdir(os.path.join(self.build, 'config'))),
+                ['dirs.h', 'package.h'])
+        dirs = self.read('dirs.h')
+        self.assertIn('#define BINDIR "/usr/local/bin"\n', dirs)
+        self.assertIn('#define DATADIR "/usr/local/share"\n', dirs)
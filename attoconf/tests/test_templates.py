@@ -0,0 +1,119 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from cStringIO import StringIO
+
+from attoconf.lib.install import Install
+from attoconf.lib import templates
+from attoconf.lib.templates import compile_template, render_stream, scan, Templates
+
+class Project(Install, Templates):
+    pass
+
+class TestScan(unittest.TestCase):
+    names = frozenset(['FOO', 'BAR'])
+
+    def split(self, text):
+        return compile_template(text, self.names)
+
+    def test_plain(self):
+        self.assertEqual(self.split(''), [''])
+        self.assertEqual(self.split('no vars'), ['no vars'])
+        self.assertEqual(self.split('@FOO@'), ['', 'FOO', ''])
+        self.assertEqual(self.split('a @FOO@@BAR@ b'),
+                ['a ', 'FOO', '', 'BAR', ' b'])
+
+    def test_unknown(self):
+        self.assertEqual(self.split('user@host @BAZ@ @'),
+                ['user@host @BAZ@ @'])
+        # the @ that ends an unknown name may start a known one
+        self.assertEqual(self.split('@BAZ@FOO@'), ['@BAZ', 'FOO', ''])
+
+    def test_spans(self):
+        text = 'x@FOO@yy'
+        self.assertEqual(list(scan(text, self.names)),
+                [(0, 1, 'FOO'), (6, 8, None)])
+
+    def test_long(self):
+        # never looks at what is too long to be a name
+        self.assertEqual(self.split('@' + 'x' * 100 + '@FOO@'),
+                ['@' + 'x' * 100, 'FOO', ''])
+
+    def test_cached(self):
+        self.assertIs(self.split('a @FOO@'), self.split('a @FOO@'))
+
+    def test_bounded(self):
+        first = self.split('a @FOO@')
+        for i in range(templates.compiled_max):
+            self.split('b%d @FOO@' % i)
+        self.assertLessEqual(len(templates._compiled), templates.compiled_max)
+        self.assertIsNot(self.split('a @FOO@'), first)
+        # using one keeps it around
+        first = self.split('a @FOO@')
+        for i in range(templates.compiled_max - 1):
+            self.split('c%d @FOO@' % i)
+            self.assertIs(self.split('a @FOO@'), first)
+
+class TestRender(unittest.TestCase):
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        self.build = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.src)
+        shutil.rmtree(self.build)
+
+    def test_stream(self):
+        text = ('@FOO@ and @BAR@, ' * 5000 + '@FOO')
+        path = os.path.join(self.src, 'big.in')
+        with open(path, 'w') as f:
+            f.write(text)
+        out = StringIO()
+        names = frozenset(['FOO', 'BAR'])
+        values = {'FOO': '1', 'BAR': '22'}
+        chunk = templates._chunk
+        templates._chunk = 7
+        try:
+            render_stream(path, out, names, values.__getitem__)
+        finally:
+            templates._chunk = chunk
+        self.assertEqual(out.getvalue(),
+                ''.join(values.get(x, x) for x in compile_template(text, names)))
+
+    def test_render(self):
+        with open(os.path.join(self.src, 'out.txt.in'), 'w') as f:
+            f.write('package @PACKAGE@ at @PREFIX@, not @NOPE@\n')
+        proj = Project(srcdir=self.src, template_files=['out.txt'],
+                package='foo', package_name='Foo')
+        build = proj.build(self.build)
+        stdout = sys.stdout
+        sys.stdout = out = StringIO()
+        try:
+            build.finish()
+        finally:
+            sys.stdout = stdout
+        with open(os.path.join(self.build, 'out.txt')) as f:
+            self.assertEqual(f.read(),
+                    'package foo at /usr/local, not @NOPE@\n')
+        self.assertIn('WARNING: variables not used:\n  BINDIR\n', out.getvalue())
@@ -0,0 +1,83 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import json
+import os
+import tempfile
+import unittest
+
+from attoconf import classy, trace
+from attoconf.lib.install import Install
+
+class Project(Install):
+    pass
+
+class TestTrace(unittest.TestCase):
+    def setUp(self):
+        self.events = trace.events[:]
+        del trace.events[:]
+        classy.timeline = []
+
+    def tearDown(self):
+        trace.events[:] = self.events
+        trace.enable('')
+
+    def test_span(self):
+        trace.enable('-')
+        with trace.span('gcc', 'exec', argv=['gcc']) as s:
+            s.args['status'] = 0
+        with self.assertRaises(ValueError):
+            with trace.span('broken', 'check'):
+                raise ValueError('oops')
+        self.assertEqual([(e['name'], e['cat'], e['ph']) for e in trace.events],
+                [('gcc', 'exec', 'X'), ('broken', 'check', 'X')])
+        self.assertEqual(trace.events[0]['args'], {'argv': ['gcc'], 'status': 0})
+        self.assertIn('oops', trace.events[1]['args']['error'])
+
+    def test_disabled(self):
+        with trace.span('gcc', 'exec'):
+            pass
+        with trace.span('register', 'python'):
+            pass
+        self.assertEqual(trace.events, [])
+
+    def test_registration(self):
+        Project(srcdir='.', package='foo', package_name='Foo')
+        self.assertEqual(trace.events, [])
+        # it happened before --trace was seen, but still counts
+        trace.enable('-')
+        names = [e['name'] for e in trace.events if e['cat'] == 'python']
+        self.assertEqual(names[-8:], ['general', 'paths', 'arches', 'vars',
+                'features', 'packages', 'post', 'register'])
+        self.assertEqual(classy.timeline, [])
+
+    def test_dump(self):
+        fd, name = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            trace.enable(name)
+            with trace.span('x', 'y'):
+                pass
+            trace.dump()
+            with open(name) as f:
+                data = json.load(f)
+        finally:
+            os.remove(name)
+        names = [e['name'] for e in data['traceEvents'] if e['ph'] == 'X']
+        self.assertEqual(names, ['x'])
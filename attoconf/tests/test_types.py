@@ -19,7 +19,7 @@ from __future__ import print_function, division, absolute_import
 
 import unittest
 
-from attoconf.types import enum, ShellList
+from attoconf.types import enum, FlagList, ShellList, shell_quote
 
 class TestEnum(unittest.TestCase):
     def test_stuff(self):
@@ -30,6 +30,11 @@ class TestEnum(unittest.TestCase):
             foobar('baz')
 
 class TestShell(unittest.TestCase):
+    def test_quote(self):
+        from pipes import quote
+        for s in ['', 'foo', 'foo bar', "it's", '$HOME', '/usr/lib', 'a=b,c']:
+            self.assertEqual(quote(s), shell_quote(s))
+
     def test_str(self):
         sh0 = ShellList('\\ ')
         self.assertEqual("' '", str(sh0))
@@ -60,3 +65,72 @@ class TestShell(unittest.TestCase):
         self.assertEqual(str(sh0 + sh1), "'foo bar' baz")
         self.assertEqual((sh0 + sh1).list, sh1.list)
         self.assertEqual(str(sh1 + sh1), "'foo bar' baz 'foo bar' baz")
+
+class TestFlagList(unittest.TestCase):
+    def test_dedup(self):
+        f = FlagList('-I/a -L/a -lfoo -lbar -DX')
+        f += '-I/b -I/a -L/a -lfoo -DX'
+        self.assertEqual(f.list,
+                ['-I/a', '-L/a', '-lfoo', '-lbar', '-DX', '-I/b', '-lfoo', '-DX'])
+        self.assertEqual(FlagList(['-lm', '-lm']).list, ['-lm'])
+
+    def test_lib_cycle(self):
+        # static libraries that need each other
+        f = FlagList('-la -lb')
+        f += '-la'
+        self.assertEqual(str(f), '-la -lb -la')
+        f = FlagList('-Wl,--start-group -la -lb -Wl,--end-group -la')
+        self.assertEqual(str(f), '-Wl,--start-group -la -lb -Wl,--end-group -la')
+
+    def test_list_live(self):
+        # checks change flags in place, as for any ShellList
+        f = FlagList('-I/a -lm')
+        self.assertEqual(str(f), '-I/a -lm')
+        f.list.append('-I/b')
+        self.assertEqual(str(f), '-I/a -lm -I/b')
+        f += '-I/b'
+        self.assertEqual(f.list, ['-I/a', '-lm', '-I/b'])
+        f.list.remove('-I/a')
+        self.assertEqual(str(f), '-lm -I/b')
+        f += '-I/a'
+        self.assertEqual(f.list, ['-lm', '-I/b', '-I/a'])
+
+    def test_args(self):
+        # not flags, but arguments of the flag before them
+        f = FlagList('-Xlinker -lfoo -lfoo -I /a -I/a -include -I/a')
+        f += ['-lfoo', '-Xlinker', '-lfoo']
+        self.assertEqual(f.list, ['-Xlinker', '-lfoo', '-lfoo', '-I', '/a',
+                '-I/a', '-include', '-I/a', '-lfoo', '-Xlinker', '-lfoo'])
+
+    def test_rebind(self):
+        # += makes a new one, so a shared value is left alone
+        f = FlagList('-O2')
+        g = f
+        g += ['-g']
+        self.assertIsNot(f, g)
+        self.assertIsInstance(g, FlagList)
+        self.assertEqual(str(f), '-O2')
+        self.assertEqual(str(g), '-O2 -g')
+        h = g + ShellList('-I/x')
+        self.assertIsInstance(h, FlagList)
+        self.assertEqual(str(g), '-O2 -g')
+        self.assertEqual(str(h), '-O2 -g -I/x')
+        c = g.copy()
+        c.list.append('-I/y')
+        self.assertEqual(str(g), '-O2 -g')
+        self.assertEqual(str(c), '-O2 -g -I/y')
+
+    def test_str(self):
+        f = FlagList(['-DX="a b"'])
+        self.assertEqual(str(f), """'-DX="a b"'""")
+        f += '-DY'
+        self.assertEqual(str(f), """'-DX="a b"' -DY""")
+        f.list = ['-lm']
+        self.assertEqual(str(f), '-lm')
+
+    def test_pickle(self):
+        import cPickle
+        f = FlagList('-I/a -lfoo')
+        g = cPickle.loads(cPickle.dumps(f, 2))
+        g += '-I/a -lfoo'
+        self.assertEqual(g.list, ['-I/a', '-lfoo'])
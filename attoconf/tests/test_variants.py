@@ -0,0 +1,126 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+from cStringIO import StringIO
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+from attoconf.lib.install import Install
+from attoconf.lib.make import Make
+from attoconf.variants import configure_main, configure_variants, read_variants
+
+class Project(Install, Make):
+    pass
+
+def log_check(build):
+    with open(build.env['VARIANTS_LOG'], 'a') as f:
+        f.write('start\n')
+        f.flush()
+        time.sleep(0.05)
+        f.write('end\n')
+
+class LoggedProject(Project):
+    def post(self):
+        super(LoggedProject, self).post()
+        self.checks.append(log_check)
+
+class TestVariants(unittest.TestCase):
+    def setUp(self):
+        self.src = tempfile.mkdtemp()
+        with open(os.path.join(self.src, 'Makefile.in'), 'w') as f:
+            f.write('all:\n')
+        self.proj = Project(srcdir=self.src, package='foo', package_name='Foo')
+
+    def tearDown(self):
+        shutil.rmtree(self.src)
+
+    def path(self, *names):
+        return os.path.join(self.src, *names)
+
+    def read(self, *names):
+        with open(self.path(*names)) as f:
+            return f.read()
+
+    def quietly(self, fn, *args):
+        stdout = sys.stdout
+        sys.stdout = StringIO()
+        try:
+            fn(*args)
+        finally:
+            out = sys.stdout.getvalue()
+            sys.stdout = stdout
+        return out
+
+    def test_read(self):
+        with open(self.path('variants'), 'w') as f:
+            f.write('# comment\n\ndebug CFLAGS="-O0 -g"\n  release\n')
+        self.assertEqual(read_variants(self.path('variants')),
+                [('debug', ['CFLAGS=-O0 -g']), ('release', [])])
+
+    def test_configure(self):
+        variants = [(self.path('b%d' % i), ['--prefix=/opt/%d' % i])
+                for i in range(3)]
+        variants.insert(1, (self.path('bad'), ['--bogus=1']))
+        statuses = []
+        out = self.quietly(lambda: statuses.extend(
+                configure_variants(self.proj, variants, os.environ, 2)))
+        self.assertEqual(statuses, [0, 1, 0, 0])
+        for i in range(3):
+            self.assertIn('PREFIX = /opt/%d\n' % i, self.read('b%d' % i, 'Makefile'))
+        self.assertFalse(os.path.exists(self.path('bad', 'Makefile')))
+        # in order, each one's output together
+        starts = [out.index('Configuring %s\n' % d) for d, a in variants]
+        self.assertEqual(starts, sorted(starts))
+        self.assertIn('Configuring %s\nUnknown option --bogus\n' % self.path('bad'), out)
+
+    def test_main(self):
+        with open(self.path('variants'), 'w') as f:
+            f.write('%s\n%s --prefix=/opt\n' % (self.path('x'), self.path('y')))
+        self.quietly(configure_main, self.proj,
+                ['--variants=' + self.path('variants'), '--prefix=/usr'], {})
+        self.assertIn('PREFIX = /usr\n', self.read('x', 'Makefile'))
+        self.assertIn('PREFIX = /opt\n', self.read('y', 'Makefile'))
+
+    def test_cache_env(self):
+        env = dict(os.environ)
+        env.pop('ATTOCONF_CACHE_DIR', None)
+        before = dict(os.environ)
+        statuses = []
+        self.quietly(lambda: statuses.extend(configure_variants(
+                self.proj, [(self.path('x'), [])], env, 1)))
+        self.assertEqual(statuses, [0])
+        # the temporary cache is only ever in the children's env
+        self.assertEqual(dict(os.environ), before)
+        self.assertNotIn('ATTOCONF_CACHE_DIR', env)
+
+    def test_first(self):
+        proj = LoggedProject(srcdir=self.src, package='foo', package_name='Foo')
+        env = dict(os.environ, VARIANTS_LOG=self.path('log'))
+        variants = [(self.path('b%d' % i), []) for i in range(3)]
+        statuses = []
+        self.quietly(lambda: statuses.extend(
+                configure_variants(proj, variants, env, 3)))
+        self.assertEqual(statuses, [0, 0, 0])
+        # the first one fills the cache before the others start
+        log = self.read('log').split()
+        self.assertEqual(log[:2], ['start', 'end'])
+        self.assertEqual(sorted(log[2:]), ['end', 'end', 'start', 'start'])
@@ -0,0 +1,58 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+from cStringIO import StringIO
+import os
+import sys
+
+from attoconf.core import Project, Build
+from attoconf.types import FlagList, ShellCommand
+from attoconf.tests.test_core import ReplacingStdout
+
+def quietly(fn, *args):
+    ''' Call fn(*args), returning what it printed instead.
+    '''
+    out = StringIO()
+    with ReplacingStdout(out):
+        fn(*args)
+    return out.getvalue()
+
+def configure_quietly(build, args=()):
+    ''' Apply args to build and finish it, returning what it printed.
+    '''
+    for arg in args:
+        build.apply_arg(arg)
+    return quietly(build.finish)
+
+def fake_cc_build(dir, source, *args):
+    ''' Write source to dir/fake-cc, and return a Build in dir
+        whose CC runs it with python (and args), with empty flags.
+    '''
+    cc = os.path.join(dir, 'fake-cc')
+    with open(cc, 'w') as f:
+        f.write(source)
+    build = Build(Project('.'), dir)
+    build.vars.update({
+        'CC': ShellCommand([sys.executable, cc] + list(args)),
+        'CFLAGS': FlagList([]),
+        'CPPFLAGS': FlagList([]),
+        'LDFLAGS': FlagList([]),
+        'LIBS': FlagList([]),
+    })
+    return build
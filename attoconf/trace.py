@@ -0,0 +1,118 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import threading
+import time
+
+events = []
+output = None
+
+
+def enable(filename):
+    ''' Type hook for --trace=FILE: write a trace when configure is done.
+
+        Registration is over by now, so what classy.timeline
+        says about it goes in the trace too.
+    '''
+    global output
+    output = filename or None
+    if output is not None:
+        from . import classy
+        timeline, classy.timeline = classy.timeline, []
+        for name, start, end, args in timeline:
+            record(name, 'python', start, end, args)
+    return filename
+
+
+def record(name, cat, start, end, args=None):
+    ''' Record a complete event; times are from time.time().
+
+        Nothing is kept unless --trace was given; registration, which
+        happens before that is known, is added by enable() instead.
+    '''
+    if output is None:
+        return
+    event = {
+        'name': name,
+        'cat': cat,
+        'ph': 'X',
+        'ts': start * 1e6,
+        'dur': (end - start) * 1e6,
+        'pid': os.getpid(),
+        'tid': threading.current_thread().ident,
+    }
+    if args:
+        event['args'] = args
+    # list.append is atomic, no need for a lock
+    events.append(event)
+
+
+class span(object):
+    ''' Context manager that records how long its body took.
+
+        Extra arguments can be added to .args before it exits.
+    '''
+    __slots__ = ('name', 'cat', 'args', 'start')
+    def __init__(self, name, cat, **args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.time()
+        return self
+
+    def __exit__(self, type, value, traceback):
+        if type is not None:
+            self.args['error'] = repr(value)
+        record(self.name, self.cat, self.start, time.time(), self.args)
+
+
+def check_name(check):
+    ''' Something human-readable to call a check in the timeline.
+    '''
+    var = getattr(check, 'var', None)
+    if var is not None:
+        return var
+    name = getattr(check, '__name__', None)
+    if name is not None:
+        return name
+    return type(check).__name__
+
+
+def dump():
+    ''' Write Chrome trace-event JSON, if --trace was given.
+
+        Load it in chrome://tracing or https://ui.perfetto.dev/
+    '''
+    if output is None:
+        return
+    import json
+    meta = []
+    for t in threading.enumerate():
+        meta.append({
+            'name': 'thread_name',
+            'ph': 'M',
+            'pid': os.getpid(),
+            'tid': t.ident,
+            'args': {'name': t.name},
+        })
+    with open(output, 'w') as f:
+        json.dump({'traceEvents': meta + events, 'displayTimeUnit': 'ms'}, f)
@@ -18,12 +18,33 @@
 from __future__ import print_function, division, absolute_import
 
 import os
-from pipes import quote as shell_quote
-from shlex import split as shell_split
 
 from .core import trim_trailing_slashes
 
 
+_safe_chars = frozenset('abcdefghijklmnopqrstuvwxyz'
+        'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789@%_-+=:,./')
+
+def shell_quote(s):
+    ''' Same as pipes.quote, which is slow to import (it imports tempfile).
+    '''
+    if not s:
+        return "''"
+    for c in s:
+        if c not in _safe_chars:
+            break
+    else:
+        return s
+    return "'" + s.replace("'", "'\"'\"'") + "'"
+
+# shlex is only needed once a list is actually parsed, so this
+# replaces itself with the real function on first use.
+def shell_split(s):
+    global shell_split
+    from shlex import split as shell_split
+    return shell_split(s)
+
+
 class IntRange(object):
     def __init__(self, min, max):
         self.min = min
@@ -86,9 +107,101 @@ class ShellList(object):
         elif isinstance(other, ShellList):
             other = other.list
         elif not isinstance(other, list):
-            raise TypeError('arg is an instance of %s' % type(arg).__name__)
+            raise TypeError('arg is an instance of %s' % type(other).__name__)
         return ShellList(self.list + other)
 
+    def copy(self):
+        return type(self)(self)
+
+
+# flags that take the next argument as their own, so it isn't a flag
+_takes_arg = frozenset(['-I', '-L', '-l', '-D', '-U', '-u', '-o', '-x',
+        '-include', '-imacros', '-isystem', '-idirafter', '-iquote',
+        '-isysroot', '-framework', '-arch', '-target', '-T', '-z',
+        '-MF', '-MT', '-MQ', '--param', '-Xclang',
+        '-Xlinker', '-Xpreprocessor', '-Xassembler'])
+
+def _flag_dirs(lst):
+    ''' The -I and -L flags in lst that name a dir (not an argument).
+    '''
+    return {a for i, a in enumerate(lst)
+            if a[:2] in ('-I', '-L') and len(a) > 2
+            and not (i and lst[i - 1] in _takes_arg)}
+
+def _extend_flags(lst, args):
+    dirs = None
+    for a in args:
+        if len(a) > 2 and a[0] == '-' and not (lst and lst[-1] in _takes_arg):
+            t = a[1]
+            if t == 'I' or t == 'L':
+                if dirs is None:
+                    dirs = _flag_dirs(lst)
+                if a in dirs:
+                    continue
+                dirs.add(a)
+            elif t == 'l':
+                if lst and lst[-1] == a and not (len(lst) > 1 and lst[-2] in _takes_arg):
+                    continue
+        lst.append(a)
+
+class FlagList(ShellList):
+    ''' A ShellList of compiler or linker flags (CPPFLAGS, LIBS, ...)
+
+        Adding flags (by + or +=, which make a new FlagList like they
+        do for a ShellList) drops the ones that can't make a difference:
+        an -I or -L dir that is already there (the first one wins),
+        and an -l right after the same -l.  Anything else is kept as-is,
+        since order or repetition might matter for it; in particular
+        a repeated -l may be resolving a cycle between static libraries.
+
+        As for a ShellList, the list attribute may be changed in place.
+    '''
+    # the list and its quoting, from the last str()
+    __slots__ = ('_quoted',)
+
+    def __init__(self, arg):
+        self._quoted = None
+        if isinstance(arg, ShellList):
+            # already flags, as they are
+            self.list = arg.list[:]
+        else:
+            super(FlagList, self).__init__([])
+            if isinstance(arg, str):
+                arg = shell_split(arg)
+            elif not isinstance(arg, list):
+                raise TypeError('arg is an instance of %s' % type(arg).__name__)
+            _extend_flags(self.list, arg)
+
+    def __add__(self, other):
+        if isinstance(other, str):
+            other = shell_split(other)
+        elif isinstance(other, ShellList):
+            other = other.list
+        elif not isinstance(other, list):
+            raise TypeError('arg is an instance of %s' % type(other).__name__)
+        result = FlagList(self)
+        _extend_flags(result.list, other)
+        return result
+
+    def __str__(self):
+        # comparing is much cheaper than quoting again
+        quoted = self._quoted
+        if quoted is None or quoted[0] != self.list:
+            quoted = self._quoted = (self.list[:],
+                    ' '.join([shell_quote(a) for a in self.list]))
+        return quoted[1]
+
+    def __reduce__(self):
+        return FlagList, (ShellList(self.list),)
+
+
+class ShellCommand(ShellList):
+    ''' A ShellList naming a program (and maybe some leading arguments)
+
+        This is how attoconf.lib.fingerprint knows what to fingerprint.
+    '''
+    __slots__ = ()
+
 
 def shell_word(s):
     if s != shell_quote(s):
@@ -0,0 +1,173 @@
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Configure several build dirs of one project at once.
+
+    Each variant is a build dir and the arguments to configure it with,
+    as if configure had been run there with those arguments. The project
+    is only registered once, then each variant is configured in a forked
+    child process (so they can't affect each other), several at a time.
+    Their output is printed in order, each variant's all together.
+
+    The variants share a probe cache: the one in $ATTOCONF_CACHE_DIR,
+    or else a temporary one that lasts as long as the run.  A variant
+    only saves its new entries when it finishes, so the first variant
+    is run alone (with all the jobs) to fill the cache, and the rest
+    are only started after it, when most of their probes are cached.
+    This is simpler than making every probe write through to the file,
+    and usually loses little: the variants mostly ask the same things.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import os
+import sys
+
+from .types import shell_split
+
+
+def read_variants(filename):
+    ''' Read a variants file: one variant per line, its build dir
+        followed by its arguments, with shell quoting.
+
+        Blank lines and lines starting with # are ignored.
+    '''
+    variants = []
+    with open(filename) as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            words = shell_split(line)
+            variants.append((words[0], words[1:]))
+    return variants
+
+def _exit_status(status):
+    if os.WIFEXITED(status):
+        return os.WEXITSTATUS(status)
+    return 128 + os.WTERMSIG(status)
+
+def _child(project, builddir, args, env, out):
+    ''' Configure one variant, in the child; never returns.
+    '''
+    status = 1
+    try:
+        os.dup2(out.fileno(), 1)
+        os.dup2(out.fileno(), 2)
+        # in case they were replaced by something that isn't fd 1 or 2
+        sys.stdout = sys.stderr = out
+        if not os.path.isdir(builddir):
+            os.makedirs(builddir)
+        project.build(builddir).configure(args, env)
+        status = 0
+    except SystemExit as e:
+        if e.code is None:
+            status = 0
+        elif isinstance(e.code, int):
+            status = e.code
+        else:
+            print(e.code, file=sys.stderr)
+    except BaseException:
+        import traceback
+        traceback.print_exc()
+    finally:
+        try:
+            sys.stdout.flush()
+            sys.stderr.flush()
+        finally:
+            os._exit(status)
+
+def configure_variants(project, variants, env, max_jobs=None):
+    ''' Configure every (builddir, args) in variants.
+
+        Returns the exit status of each, in the same order.
+        The first one is configured before any of the others,
+        see the module docstring.
+    '''
+    import shutil
+    import tempfile
+    from .jobs import default_jobs
+    if max_jobs is None:
+        max_jobs = default_jobs()
+    max_jobs = max(1, min(max_jobs, len(variants)))
+    env = dict(env)
+    # the first one has the machine to itself
+    first_env = dict(env)
+    if 'ATTOCONF_JOBS' not in env:
+        # each variant runs probes in parallel too
+        env['ATTOCONF_JOBS'] = str(max(1, default_jobs() // max_jobs))
+
+    tmp_cache = None
+    if not env.get('ATTOCONF_CACHE_DIR'):
+        # only the children see it, through the env they configure with
+        tmp_cache = tempfile.mkdtemp(prefix='attoconf-variants-')
+        env['ATTOCONF_CACHE_DIR'] = first_env['ATTOCONF_CACHE_DIR'] = tmp_cache
+    outputs = [tempfile.TemporaryFile() for _ in variants]
+    statuses = [None] * len(variants)
+    running = {}
+    started = printed = 0
+    try:
+        while printed < len(variants):
+            # until the first one is done, it's the only one
+            limit = max_jobs if statuses[0] is not None else 1
+            while started < len(variants) and len(running) < limit:
+                builddir, args = variants[started]
+                sys.stdout.flush()
+                sys.stderr.flush()
+                pid = os.fork()
+                if not pid:
+                    _child(project, builddir, args,
+                            env if started else first_env, outputs[started])
+                running[pid] = started
+                started += 1
+            pid, status = os.wait()
+            i = running.pop(pid)
+            statuses[i] = _exit_status(status)
+            while printed < len(variants) and statuses[printed] is not None:
+                out = outputs[printed]
+                out.seek(0)
+                print('Configuring %s' % variants[printed][0])
+                sys.stdout.write(out.read())
+                sys.stdout.flush()
+                printed += 1
+    finally:
+        for pid in running:
+            os.waitpid(pid, 0)
+        for out in outputs:
+            out.close()
+        if tmp_cache is not None:
+            shutil.rmtree(tmp_cache)
+    return statuses
+
+def configure_main(project, args, env):
+    ''' What a configure script's main() usually does, that is
+        project.build('.').configure(args, env), except that
+        --variants=FILE configures each variant in FILE instead,
+        with the rest of args added before each variant's own.
+    '''
+    files = [a.split('=', 1)[1] for a in args if a.startswith('--variants=')]
+    if not files:
+        project.build('.').configure(args, env)
+        return
+    args = [a for a in args if not a.startswith('--variants=')]
+    variants = []
+    for filename in files:
+        variants.extend((d, args + a) for d, a in read_variants(filename))
+    statuses = configure_variants(project, variants, env)
+    failed = [d for (d, a), s in zip(variants, statuses) if s]
+    if failed:
+        sys.exit('configure failed for: %s' % ' '.join(failed))
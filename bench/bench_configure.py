@@ -0,0 +1,259 @@
+#!/usr/bin/env python
+
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Time configure-time work on synthetic projects.
+
+    Usage: python bench/bench_configure.py [--quick] [--repeat=N]
+                                           [--only=NAME] [--output=FILE]
+
+    Each scenario generates a ClassyProject subclass of some size, and
+    times registration, argument parsing, finish(), help rendering and
+    output generation (the part of finish() spent in output hooks)
+    separately.  The compiler and pkg-config are
+    replaced by trivial shell scripts, so what is measured is attoconf.
+
+    The results are printed (or written) as JSON, one record per
+    scenario and phase, with the best and mean of N runs.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+from cStringIO import StringIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from attoconf.core import uses
+from attoconf.lib.c import C
+from attoconf.lib.config_hash import ConfigHash
+from attoconf.lib.install import Install
+from attoconf.lib.pkg_config import PkgConfig
+from attoconf.lib.templates import Templates
+from attoconf.types import enum
+from attoconf.version import full_version
+
+
+fake_cc = '''#!/bin/sh
+exit 0
+'''
+
+fake_pkg_config = '''#!/bin/sh
+query=$1
+shift
+case "$query" in
+    --version) echo 0.29 ;;
+    --modversion) for p; do echo 1.0; done ;;
+    --cflags) for p; do printf -- '-I/opt/%s/include ' "$p"; done; echo -D_REENTRANT ;;
+    --libs) for p; do printf -- '-L/opt/%s/lib ' "$p"; done; for p; do printf -- '-l%s ' "$p"; done; echo ;;
+esac
+'''
+
+# (name, options, alias depth, templates, packages)
+scenarios = [
+    ('options-10', 10, 10, 0, 0),
+    ('options-1k', 1000, 10, 0, 0),
+    ('options-10k', 10000, 10, 0, 0),
+    ('aliases-500', 10, 500, 0, 0),
+    ('templates-300', 100, 10, 300, 0),
+    ('packages-50', 10, 10, 0, 50),
+]
+quick = ['options-10', 'options-1k', 'templates-300', 'packages-50']
+
+yesno = enum('yes', 'no')
+
+@uses()
+def noop(build, **kwargs):
+    pass
+
+
+# seconds spent in each call of an output hook, see time_output_hooks()
+output_times = []
+
+def time_output_hooks(checks):
+    ''' Make every output hook (check with a true regenerate) among checks
+        add how long it took to output_times.
+
+        This patches the class, not the check, so they still pickle.
+    '''
+    for cls in set(type(c) for c in checks if getattr(c, 'regenerate', False)):
+        if getattr(cls.__call__, 'timed', False):
+            continue
+        def timed_call(self, build, call=cls.__call__):
+            t = time.time()
+            try:
+                call(self, build)
+            finally:
+                # list.append is atomic, and hooks may run in threads
+                output_times.append(time.time() - t)
+        timed_call.timed = True
+        cls.__call__ = timed_call
+
+
+def make_tools(dir):
+    for name, text in [('gcc', fake_cc), ('pkg-config', fake_pkg_config)]:
+        path = os.path.join(dir, name)
+        with open(path, 'w') as f:
+            f.write(text)
+        os.chmod(path, 0755)
+
+
+def make_templates(srcdir, count):
+    names = []
+    for i in range(count):
+        name = 'gen%d.txt' % i
+        with open(os.path.join(srcdir, name + '.in'), 'w') as f:
+            for line in range(200):
+                f.write('line %d of %s: prefix=@PREFIX@ cc=@CC@ opt=@ENABLE_OPT%d@\n'
+                        % (line, name, line % 10))
+        names.append(name)
+    return names
+
+
+def make_project(options, depth):
+    class Synthetic(PkgConfig, C, Install, ConfigHash, Templates):
+        def features(self):
+            super(Synthetic, self).features()
+            for i in range(options):
+                self.add_option('--enable-opt%d' % i, init='no',
+                        type=yesno, check=noop,
+                        help='synthetic option %d' % i, hidden=False)
+            prev = '--enable-opt0=yes'
+            for i in range(depth):
+                self.add_alias('--chain%d' % i, [prev],
+                        help=None, hidden=True)
+                prev = '--chain%d' % i
+    return Synthetic
+
+
+def run_once(options, depth, templates, packages, tmp):
+    srcdir = os.path.join(tmp, 'src')
+    builddir = os.path.join(tmp, 'build')
+    for d in [srcdir, builddir]:
+        if os.path.isdir(d):
+            shutil.rmtree(d)
+        os.mkdir(d)
+    template_files = make_templates(srcdir, templates)
+    cls = make_project(options, depth)
+    timings = {}
+
+    t = time.time()
+    proj = cls(srcdir=srcdir, template_files=template_files,
+            required_packages=['pkg%d' % i for i in range(packages)],
+            optional_packages=[])
+    proj.set_package('synthetic', 'Synthetic project')
+    timings['register'] = time.time() - t
+    time_output_hooks(proj.checks)
+    del output_times[:]
+
+    args = ['--prefix=/opt/synthetic', 'CFLAGS=-O0']
+    args += ['--enable-opt%d=yes' % i for i in range(0, options, 3)]
+    if depth:
+        args.append('--chain%d' % (depth - 1))
+    t = time.time()
+    build = proj.build(builddir)
+    for arg in args:
+        build.apply_arg(arg)
+    timings['parse'] = time.time() - t
+
+    t = time.time()
+    build.finish()
+    timings['finish'] = time.time() - t
+    timings['output'] = sum(output_times)
+
+    t = time.time()
+    proj.help.print(StringIO(), True)
+    timings['help'] = time.time() - t
+    return timings
+
+
+def main(argv):
+    repeat = 3
+    only = None
+    output = None
+    names = [s[0] for s in scenarios]
+    for arg in argv:
+        if arg == '--quick':
+            names = quick
+            repeat = 1
+        elif arg.startswith('--repeat='):
+            repeat = int(arg.split('=', 1)[1])
+        elif arg.startswith('--only='):
+            only = arg.split('=', 1)[1].split(',')
+        elif arg.startswith('--output='):
+            output = arg.split('=', 1)[1]
+        else:
+            sys.exit(__doc__)
+    if only is not None:
+        names = only
+
+    tmp = tempfile.mkdtemp(prefix='attoconf-bench-')
+    tools = os.path.join(tmp, 'bin')
+    os.mkdir(tools)
+    make_tools(tools)
+    os.environ['PATH'] = tools + ':' + os.environ.get('PATH', '')
+    results = []
+    real_stdout = sys.stdout
+    try:
+        for name, options, depth, templates, packages in scenarios:
+            if name not in names:
+                continue
+            runs = []
+            for _ in range(repeat):
+                sys.stdout = StringIO()
+                try:
+                    runs.append(run_once(options, depth, templates, packages, tmp))
+                finally:
+                    sys.stdout = real_stdout
+            for phase in ['register', 'parse', 'finish', 'output', 'help']:
+                times = [r[phase] for r in runs]
+                results.append({
+                    'scenario': name,
+                    'phase': phase,
+                    'best': min(times),
+                    'mean': sum(times) / len(times),
+                    'runs': len(times),
+                })
+                print('%-14s %-9s %9.3f ms' % (name, phase, min(times) * 1e3),
+                        file=sys.stderr)
+    finally:
+        shutil.rmtree(tmp)
+
+    report = {
+        'attoconf': full_version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'time': time.time(),
+        'results': results,
+    }
+    if output is None:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        print()
+    else:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Compare no-op build times of the demo project with make and ninja.
+
+    Usage: python bench/bench_noop.py [--repeat=N] [--output=FILE]
+
+    The demo project is configured once (with the real compiler, since
+    this time it actually gets built), built fully with each backend in
+    its own build dir, then rebuilt N times with nothing to do.
+    A backend whose tool isn't installed is reported as skipped.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from attoconf.version import full_version
+
+backends = [
+    ('make', ['make', '-s']),
+    ('ninja', ['ninja']),
+]
+
+
+def which(name):
+    for dir in os.environ.get('PATH', '').split(os.pathsep):
+        path = os.path.join(dir, name)
+        if os.access(path, os.X_OK):
+            return path
+    return None
+
+
+def main(argv):
+    repeat = 20
+    output = None
+    for arg in argv:
+        if arg.startswith('--repeat='):
+            repeat = int(arg.split('=', 1)[1])
+        elif arg.startswith('--output='):
+            output = arg.split('=', 1)[1]
+        else:
+            sys.exit(__doc__)
+
+    os.environ['PYTHONPATH'] = root
+    configure = os.path.join(root, 'demo-project', 'configure')
+    tmp = tempfile.mkdtemp(prefix='attoconf-bench-')
+    results = []
+    try:
+        with open(os.devnull, 'w') as null:
+            for name, cmd in backends:
+                result = {
+                    'scenario': 'noop-build',
+                    'phase': name,
+                }
+                results.append(result)
+                if which(cmd[0]) is None:
+                    result['skipped'] = '%s not found' % cmd[0]
+                    print('%-14s skipped' % name, file=sys.stderr)
+                    continue
+                builddir = os.path.join(tmp, name)
+                os.mkdir(builddir)
+                subprocess.check_call([sys.executable, configure],
+                        cwd=builddir, stdout=null)
+                subprocess.check_call(cmd, cwd=builddir, stdout=null)
+                times = []
+                for _ in range(repeat):
+                    t = time.time()
+                    subprocess.check_call(cmd, cwd=builddir, stdout=null)
+                    times.append(time.time() - t)
+                result.update(best=min(times), mean=sum(times) / len(times),
+                        runs=repeat)
+                print('%-14s %9.3f ms' % (name, min(times) * 1e3),
+                        file=sys.stderr)
+    finally:
+        shutil.rmtree(tmp)
+
+    report = {
+        'attoconf': full_version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'time': time.time(),
+        'results': results,
+    }
+    if output is None:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        print()
+    else:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
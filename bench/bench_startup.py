@@ -0,0 +1,174 @@
+#!/usr/bin/env python
+
+#   Copyright 2026 Ben Longbons <b.r.longbons@gmail.com>
+#
+#   This file is part of attoconf.
+#
+#   attoconf is free software: you can redistribute it and/or modify
+#   it under the terms of the GNU General Public License as published by
+#   the Free Software Foundation, either version 3 of the License, or
+#   (at your option) any later version.
+#
+#   attoconf is distributed in the hope that it will be useful,
+#   but WITHOUT ANY WARRANTY; without even the implied warranty of
+#   MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#   GNU General Public License for more details.
+#
+#   You should have received a copy of the GNU General Public License
+#   along with attoconf.  If not, see <http://www.gnu.org/licenses/>.
+
+''' Time how long the demo project's configure takes to get going.
+
+    Usage: python bench/bench_startup.py [--repeat=N] [--check]
+                                         [--output=FILE]
+
+    Measured, as wall-clock time of a fresh process:
+      python          an empty interpreter, as a baseline
+      help            configure --help
+      config.status   ./config.status --recheck, re-running configure
+      regenerate      ./config.status, just regenerating the outputs
+      regenerate-1k   the same, for a synthetic project with 1000 options
+                      (see bench_configure.py), whose saved graph of checks
+                      config.status must not be slowed down by
+
+    Each is reported along with its overhead over the baseline; with
+    --check, exit nonzero if any overhead is above its target.
+    The toolchain is the same fake one as in bench_configure.py.
+'''
+
+from __future__ import print_function, division, absolute_import
+
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+from attoconf.version import full_version
+from bench_configure import make_tools
+
+# milliseconds over the bare interpreter
+targets = {
+    'help': 35,
+    'config.status': 150,
+    'regenerate': 40,
+    'regenerate-1k': 40,
+}
+
+synthetic_configure = '''#!%s
+import os
+import sys
+sys.path[:0] = [%r, %r]
+from bench_configure import make_project
+proj = make_project(1000, 0)(srcdir=os.path.dirname(os.path.abspath(__file__)),
+        template_files=[], required_packages=[], optional_packages=[])
+proj.set_package('synthetic', 'Synthetic project')
+proj.build('.').configure(sys.argv[1:], os.environ)
+'''
+
+
+def best_of(repeat, argv, cwd):
+    times = []
+    with open(os.devnull, 'w') as null:
+        for _ in range(repeat):
+            t = time.time()
+            subprocess.check_call(argv, cwd=cwd, stdout=null, stderr=null)
+            times.append(time.time() - t)
+    return min(times), sum(times) / len(times)
+
+
+def main(argv):
+    repeat = 10
+    check = False
+    output = None
+    for arg in argv:
+        if arg.startswith('--repeat='):
+            repeat = int(arg.split('=', 1)[1])
+        elif arg == '--check':
+            check = True
+        elif arg.startswith('--output='):
+            output = arg.split('=', 1)[1]
+        else:
+            sys.exit(__doc__)
+
+    tmp = tempfile.mkdtemp(prefix='attoconf-bench-')
+    tools = os.path.join(tmp, 'bin')
+    os.mkdir(tools)
+    make_tools(tools)
+    # config.status starts with #!/usr/bin/env python; make that us
+    os.environ['PATH'] = ':'.join([tools, os.path.dirname(sys.executable),
+            os.environ.get('PATH', '')])
+    os.environ['PYTHONPATH'] = root
+    configure = os.path.join(root, 'demo-project', 'configure')
+    synthetic = os.path.join(tmp, 'synthetic')
+    os.mkdir(synthetic)
+    with open(os.path.join(synthetic, 'configure'), 'w') as f:
+        f.write(synthetic_configure % (sys.executable, root,
+                os.path.dirname(os.path.abspath(__file__))))
+    results = []
+    failed = False
+    try:
+        with open(os.devnull, 'w') as null:
+            subprocess.check_call([sys.executable, configure], cwd=tmp,
+                    stdout=null)
+            # it warns about all the vars that no template uses
+            subprocess.check_call([sys.executable, 'configure'],
+                    cwd=synthetic, stdout=null, stderr=null)
+        cases = [
+            ('python', [sys.executable, '-c', 'pass'], tmp),
+            ('help', [sys.executable, configure, '--help'], tmp),
+            ('config.status', ['./config.status', '--recheck'], tmp),
+            ('regenerate', ['./config.status'], tmp),
+            ('regenerate-1k', ['./config.status'], synthetic),
+        ]
+        base = None
+        for name, cmd, cwd in cases:
+            best, mean = best_of(repeat, cmd, cwd)
+            if base is None:
+                base = best
+            result = {
+                'scenario': 'startup',
+                'phase': name,
+                'best': best,
+                'mean': mean,
+                'runs': repeat,
+            }
+            line = '%-14s %9.3f ms' % (name, best * 1e3)
+            if name in targets:
+                overhead = (best - base) * 1e3
+                ok = overhead <= targets[name]
+                failed |= not ok
+                result.update(overhead_ms=overhead,
+                        target_ms=targets[name], ok=ok)
+                line += '  (+%.3f ms, target %d ms%s)' % (overhead,
+                        targets[name], '' if ok else ', MISSED')
+            print(line, file=sys.stderr)
+            results.append(result)
+    finally:
+        shutil.rmtree(tmp)
+
+    report = {
+        'attoconf': full_version,
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'time': time.time(),
+        'results': results,
+    }
+    if output is None:
+        json.dump(report, sys.stdout, indent=1, sort_keys=True)
+        print()
+    else:
+        with open(output, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+    if check and failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])